@@ -0,0 +1,52 @@
+import random
+from collections import deque
+
+from settings import *
+from maze import BITS, MOVES
+
+# Bots for headless games. Each one is a factory taking a seed and returning
+# agent(state), which gives the next action like the keyboard would: 'a',
+# 's', 'd', 'w' or None to keep going.
+
+
+def idle(seed):
+    return lambda state: None
+
+
+def random_walk(seed, turn_chance=0.03):
+    rnd = random.Random(seed)
+
+    def agent(state):
+        if rnd.random() < turn_chance:
+            return rnd.choice('asdw')
+        return None
+    return agent
+
+
+def pellet_chaser(seed):
+    # heads for the closest pellet, deciding only in the middle of a tile
+    rnd = random.Random(seed)
+
+    def agent(state):
+        player = state.player
+        if player.x % TILE or player.y % TILE:
+            return None
+        maze = state.maze
+        start = player.y // TILE % maze.rows * maze.cols + player.x // TILE % maze.cols
+        first = {start: None}
+        queue = deque([start])
+        while queue:
+            tile = queue.popleft()
+            if state.pellets.kinds[tile] and tile != start:
+                return first[tile]
+            keys = list(MOVES)
+            rnd.shuffle(keys)
+            for key in keys:
+                if not maze.exits[tile] & BITS[key]:
+                    continue
+                other = maze.neighbour(tile, key)
+                if other not in first:
+                    first[other] = first[tile] or key
+                    queue.append(other)
+        return None
+    return agent
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+
+import pygame
+from settings import *
+
+# Every texture the game uses, by name. Nothing is read from disk until the
+# first image() call, then all the small tiles come in as one packed atlas,
+# from ASSETS_CACHE_DIR when the files haven't changed since it was written.
+
+MANIFEST = {name: "images/%s.png" % name for name in (
+    'wall_up', 'wall_right', 'wall_down', 'wall_left',
+    'wall_turn_up-right', 'wall_turn_right-down', 'wall_turn_down-left', 'wall_turn_left-up',
+    'wall_corner_up-right', 'wall_corner_right-down', 'wall_corner_down-left', 'wall_corner_left-up',
+    'small_point', 'big_point',
+    'pacman_opened', 'pacman_closed',
+    'blinky_up', 'blinky_down', 'blinky_front1', 'blinky_front2',
+    'pinky_up', 'pinky_down', 'pinky_front1', 'pinky_front2',
+    'inky_up', 'inky_down', 'inky_front1', 'inky_front2',
+    'clyde_up', 'clyde_down', 'clyde_front1', 'clyde_front2',
+)}
+
+ATLAS_WIDTH = 256
+
+
+class Assets:
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.atlas = None
+        self.rects = {}
+        self.images = {}
+
+    def image(self, name):
+        surface = self.images.get(name)
+        if surface is None:
+            if self.atlas is None:
+                self.load_atlas()
+            surface = self.atlas.subsurface(self.rects[name])
+            self.images[name] = surface
+        return surface
+
+    def manifest_key(self):
+        digest = hashlib.sha1()
+        for name, path in sorted(self.manifest.items()):
+            stat = os.stat(path)
+            digest.update(("%s %s %d %d\n" % (name, path, stat.st_mtime_ns, stat.st_size)).encode())
+        return digest.hexdigest()
+
+    def load_atlas(self):
+        key = self.manifest_key()
+        image_path = os.path.join(ASSETS_CACHE_DIR, "atlas.png")
+        index_path = os.path.join(ASSETS_CACHE_DIR, "atlas.json")
+        if ASSETS_CACHE_DIR and os.path.exists(index_path):
+            with open(index_path) as file:
+                index = json.load(file)
+            if index["key"] == key and os.path.exists(image_path):
+                self.atlas = pygame.image.load(image_path)
+                self.rects = {name: pygame.Rect(rect) for name, rect in index["rects"].items()}
+                return
+
+        self.pack({name: pygame.image.load(path) for name, path in self.manifest.items()})
+        if ASSETS_CACHE_DIR:
+            os.makedirs(ASSETS_CACHE_DIR, exist_ok=True)
+            pygame.image.save(self.atlas, image_path)
+            with open(index_path, "w") as file:
+                json.dump({"key": key, "rects": {name: list(rect) for name, rect in self.rects.items()}}, file)
+
+    def pack(self, images):
+        # shelf packing, tallest images first
+        x = y = shelf = 0
+        for name, image in sorted(images.items(), key=lambda item: -item[1].get_height()):
+            width, height = image.get_size()
+            if x + width > ATLAS_WIDTH:
+                x, y, shelf = 0, y + shelf, 0
+            self.rects[name] = pygame.Rect(x, y, width, height)
+            x += width
+            shelf = max(shelf, height)
+
+        self.atlas = pygame.Surface((ATLAS_WIDTH, y + shelf), pygame.SRCALPHA)
+        for name, image in images.items():
+            self.atlas.blit(image, self.rects[name], special_flags=pygame.BLEND_RGBA_MAX)
+
+
+assets = Assets(MANIFEST)
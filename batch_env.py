@@ -0,0 +1,128 @@
+import argparse
+import time
+
+import numpy as np
+
+from settings import *
+from maze import BITS, MOVES, get_maze
+from pellets import SCORES, Pellets
+
+# Many games of one level stepped together, every game is a row of numpy
+# arrays. Player movement follows GameState.step to the pixel, ghosts are
+# left out. Actions are -1 for no key or an index into KEYS.
+
+KEYS = 'asdw'
+DX = np.array([MOVES[key][0] for key in KEYS])
+DY = np.array([MOVES[key][1] for key in KEYS])
+KEY_BITS = np.array([BITS[key] for key in KEYS], dtype=np.uint8)
+SCORE_TABLE = np.zeros(256, dtype=np.int64)
+for kind, points in SCORES.items():
+    SCORE_TABLE[kind] = points
+
+
+class BatchEnv:
+
+    def __init__(self, level_map, count, player_spawn=PLAYER_SPAWN, max_ticks=None):
+        maze = get_maze(level_map)
+        self.count = count
+        self.rows = maze.rows
+        self.cols = maze.cols
+        self.wrap_x = (self.cols - 1) * TILE
+        self.wrap_y = (self.rows - 1) * TILE
+        self.player_spawn = player_spawn
+        self.max_ticks = max_ticks
+        self.exits = np.frombuffer(maze.exits.tobytes(), dtype=np.uint8)
+        self.start_pellets = np.frombuffer(bytes(Pellets(maze).kinds), dtype=np.uint8)
+
+        self.x = np.zeros(count, dtype=np.int64)
+        self.y = np.zeros(count, dtype=np.int64)
+        self.direction = np.zeros(count, dtype=np.int64)  # KEYS index of the angle
+        self.key = np.zeros(count, dtype=np.int64)
+        self.moved_x = np.zeros(count, dtype=np.int64)
+        self.moved_y = np.zeros(count, dtype=np.int64)
+        self.pellets = np.zeros((count, len(self.start_pellets)), dtype=np.uint8)
+        self.remaining = np.zeros(count, dtype=np.int64)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.tick = np.zeros(count, dtype=np.int64)
+        self.games = np.arange(count)
+        self.reset()
+
+    def reset(self, games=None):
+        # all games, or the ones in games (indices or a bool mask)
+        if games is None:
+            games = slice(None)
+        self.x[games], self.y[games] = self.player_spawn
+        self.direction[games] = self.key[games] = KEYS.index('a')
+        self.moved_x[games], self.moved_y[games] = MOVES['a']
+        self.pellets[games] = self.start_pellets
+        self.remaining[games] = np.count_nonzero(self.start_pellets)
+        self.score[games] = 0
+        self.tick[games] = 0
+        return self.observe()
+
+    def observe(self):
+        return {"x": self.x, "y": self.y, "direction": self.direction,
+                "pellets": self.pellets, "score": self.score}
+
+    def is_next_wall(self, key):
+        tile = self.y // TILE * self.cols + self.x // TILE
+        wall = (self.exits[tile] & KEY_BITS[key]) == 0
+        horizontal = key % 2 == 0
+        same_axis = horizontal == (self.direction % 2 == 0)
+        along = np.where(horizontal, self.x, self.y) % TILE
+        across = np.where(horizontal, self.y, self.x) % TILE
+        return np.where(wall, ~same_axis | (along == 0), ~same_axis & (across != 0))
+
+    def step(self, actions=None):
+        # returns observations, rewards, dones; finished games start over
+        self.x %= self.wrap_x
+        self.y %= self.wrap_y
+        if actions is not None:
+            actions = np.asarray(actions)
+            self.key = np.where(actions >= 0, actions, self.key)
+
+        turn = ~self.is_next_wall(self.key)
+        stop = ~turn & self.is_next_wall(self.direction)
+        self.moved_x = np.where(turn, DX[self.key], np.where(stop, 0, self.moved_x))
+        self.moved_y = np.where(turn, DY[self.key], np.where(stop, 0, self.moved_y))
+        facing = (self.moved_x == DX[self.key]) & (self.moved_y == DY[self.key])
+        self.direction = np.where(facing, self.key, self.direction)
+
+        self.x += self.moved_x
+        self.y += self.moved_y
+        tile = self.y // TILE % self.rows * self.cols + self.x // TILE % self.cols
+        kinds = self.pellets[self.games, tile]
+        self.pellets[self.games, tile] = 0
+        rewards = SCORE_TABLE[kinds]
+        self.score += rewards
+        self.remaining -= kinds != 0
+        self.tick += 1
+
+        dones = self.remaining == 0
+        if self.max_ticks is not None:
+            dones |= self.tick >= self.max_ticks
+        if dones.any():
+            self.reset(dones)
+        return self.observe(), rewards, dones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step many games at once with random input")
+    parser.add_argument("--games", type=int, default=256)
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    env = BatchEnv(level_1_map, args.games)
+    rnd = np.random.default_rng(0)
+    actions = rnd.integers(-1, len(KEYS), size=(args.ticks, args.games))
+    actions[rnd.random((args.ticks, args.games)) < 0.95] = -1
+    started = time.perf_counter()
+    for tick_actions in actions:
+        env.step(tick_actions)
+    elapsed = time.perf_counter() - started
+    print("%d games x %d ticks in %.3f s: %d steps/s" %
+          (args.games, args.ticks, elapsed, args.games * args.ticks / elapsed))
+
+
+if __name__ == "__main__":
+    main()
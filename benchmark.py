@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from settings import *
+
+# Headless benchmarks of the hot paths. Every run is appended to a JSON
+# history file and compared with the baseline stored there; a metric worse
+# than the baseline by more than the threshold fails the run.
+#
+#   python benchmark.py                  run and compare
+#   python benchmark.py --save-baseline  run and make this run the baseline
+
+HISTORY_FILE = "benchmarks.json"
+THRESHOLD = 0.2  # allowed regression, as a fraction of the baseline
+
+
+def best_of(function, repeat, number):
+    # fastest of repeat rounds, seconds per call
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = (time.perf_counter() - started) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class RandomInput:
+    # same key presses every run, a new game whenever the last one is over
+
+    def __init__(self, holder):
+        self.holder = holder
+        self.random = random.Random(0)
+
+    def __call__(self):
+        from game_state import GameState
+        if self.holder.state.game_over:
+            self.holder.state = GameState(level_1_map, PLAYER_SPAWN)
+        if self.random.random() < 0.03:
+            return self.random.choice('asdw')
+        return None
+
+
+class Game:
+
+    def __init__(self):
+        from game_state import GameState
+        self.state = GameState(level_1_map, PLAYER_SPAWN)
+        self.input = RandomInput(self)
+
+    def step(self):
+        self.state.step(self.input())
+
+
+def bench_engine_step():
+    return 1 / best_of(Game().step, 5, 20000)
+
+
+def bench_player_update():
+    from game_state import GameState
+    from player import Player
+    from level_1_sprites import PelletLayer
+    state = GameState(level_1_map, PLAYER_SPAWN)
+    player = Player(pygame.sprite.LayeredDirty(), state, PelletLayer(state.pellets), None)
+    player.controls = RandomInput(player)
+    return 1 / best_of(player.update, 5, 20000)
+
+
+def level_scene(screen):
+    from drawing import Drawing
+    from game_state import GameState
+    from player import Player
+    from ghost import Ghost
+    from level_1_sprites import PelletLayer, build_walls
+    state = GameState(level_1_map, PLAYER_SPAWN)
+    pellet_layer = PelletLayer(state.pellets)
+    actors = pygame.sprite.LayeredDirty()
+    player = Player(actors, state, pellet_layer, None)
+    player.controls = RandomInput(player)
+    ghosts = [Ghost(actors, ghost) for ghost in state.ghosts]
+    return Drawing(screen), build_walls(level_1_map), player, pellet_layer, actors, ghosts
+
+
+def bench_drawing_level():
+    screen = pygame.display.get_surface()
+    drawer, walls, player, pellet_layer, actors, _ = level_scene(screen)
+
+    def frame():
+        screen.fill(BLACK)
+        drawer.drawing_level(walls, player, pellet_layer, actors)
+    return best_of(frame, 5, 100) * 1000
+
+
+def bench_drawing_level_dirty():
+    screen = pygame.display.get_surface()
+    drawer, walls, player, pellet_layer, actors, ghosts = level_scene(screen)
+    drawer.drawing_level_background(walls, pellet_layer, actors)
+    clock = pygame.time.Clock()
+
+    def frame():
+        player.update()
+        for ghost in ghosts:
+            ghost.update()
+        drawer.drawing_level_dirty(player, clock)
+    return best_of(frame, 5, 200) * 1000
+
+
+def bench_drawing_button():
+    from button import Button
+    from drawing import Drawing
+    drawer = Drawing(pygame.display.get_surface())
+    button = Button((300, 193), 200, 40, "Level 1", 15)
+    return best_of(lambda: drawer.drawing_button(button), 5, 1000) * 1e6
+
+
+def bench_build_level():
+    from game_state import GameState
+    from level_1_sprites import PelletLayer, build_walls
+
+    def build():
+        state = GameState(level_1_map, PLAYER_SPAWN)
+        build_walls(level_1_map)
+        PelletLayer(state.pellets)
+    return best_of(build, 5, 20) * 1000
+
+
+def bench_import_settings():
+    # cold import in a fresh interpreter, from python's own import timing
+    best = None
+    for _ in range(5):
+        output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import settings"],
+                                capture_output=True, text=True).stderr
+        match = re.search(r"\|\s*(\d+)\s*\|\s*settings$", output, re.MULTILINE)
+        micros = int(match.group(1))
+        best = micros if best is None else min(best, micros)
+    return best / 1000
+
+
+# name: (function, unit, whether higher is better)
+BENCHMARKS = {
+    "engine_step": (bench_engine_step, "ticks/s", True),
+    "player_update": (bench_player_update, "ticks/s", True),
+    "drawing_level": (bench_drawing_level, "ms/frame", False),
+    "drawing_level_dirty": (bench_drawing_level_dirty, "ms/frame", False),
+    "drawing_button": (bench_drawing_button, "us/call", False),
+    "build_level": (bench_build_level, "ms", False),
+    "import_settings": (bench_import_settings, "ms", False),
+}
+
+
+def regression(name, value, baseline):
+    # how much worse than the baseline, as a fraction, negative when better
+    higher_is_better = BENCHMARKS[name][2]
+    if higher_is_better:
+        return (baseline - value) / baseline
+    return (value - baseline) / baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, all of them by default")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed regression against the baseline, 0.2 is 20%%")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        function, unit, _ = BENCHMARKS[name]
+        results[name] = function()
+        print("%-20s %12.3f %s" % (name, results[name], unit))
+
+    history = {"baseline": {}, "runs": []}
+    if os.path.exists(args.history):
+        with open(args.history) as file:
+            history = json.load(file)
+    history["runs"].append({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results})
+
+    failed = []
+    if args.save_baseline:
+        history["baseline"].update(results)
+    else:
+        for name, value in results.items():
+            baseline = history["baseline"].get(name)
+            if baseline is None:
+                continue
+            worse = regression(name, value, baseline)
+            if worse > args.threshold:
+                failed.append(name)
+                print("%s regressed %.0f%% against the baseline %.3f" % (name, worse * 100, baseline))
+
+    with open(args.history, "w") as file:
+        json.dump(history, file, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from ghost_state import GhostState
+
+
+class Blinky(GhostState):
+    __slots__ = ()
+    name = 'blinky'
+    slot = 0
+
+    def scatter_target(self, state):
+        return -3, state.cols - 3
+
+    def chase_target(self, state):
+        return state.player_tile()
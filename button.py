@@ -1,8 +1,6 @@
 import pygame
 from settings import *
 
-pygame.init()
-
 
 class Button:
     def __init__(self, position, width, height, text, rounding):
@@ -13,18 +11,35 @@ class Button:
         self.color_text = GRAY
         self.color = GRAY
         self.rounding = rounding
+        self.surfaces = {}  # pre-rendered button for every color it is drawn in
+        self.tile = TILE  # the view's tile size the surfaces were made for
+        # edges included, the hover area is WID x HEI whatever the button size
+        self.hover_rect = pygame.Rect(self.x, self.y, WID + 1, HEI + 1)
+        self.click_rect = pygame.Rect(self.x, self.y, width + 1, height + 1)
+        self.rect = pygame.Rect(self.x, self.y, width, height)
+        self.hovered = False
+
+    def hover(self, hovered):
+        # returns whether the button has to be repainted
+        if hovered == self.hovered:
+            return False
+        self.hovered = hovered
+        self.color = self.color_text = WHITE if hovered else GRAY
+        return True
+
+
+class ButtonLayout:
+    # the buttons of a menu by name, mouse events are tested against them once
+
+    def __init__(self, buttons):
+        self.buttons = buttons
+
+    def hover(self, pos):
+        # the buttons whose hover state changed
+        return [button for button in self.buttons.values() if button.hover(button.hover_rect.collidepoint(pos))]
 
-    def motion(self):
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_pressed = pygame.mouse.get_pressed()
-        x_mouse, y_mouse = mouse_pos
-        if self.x <= x_mouse <= self.x + WID and self.y <= y_mouse <= self.y + HEI:
-            self.color = WHITE
-            self.color_text = WHITE
-        else:
-            self.color = GRAY
-            self.color_text = GRAY
-        if (mouse_pressed[0] and
-                self.x <= x_mouse <= self.x + self.width and self.y <= y_mouse <= self.y + self.height):
-            return True
-        return False
+    def click(self, pos):
+        for name, button in self.buttons.items():
+            if button.click_rect.collidepoint(pos):
+                return name
+        return None
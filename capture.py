@@ -0,0 +1,118 @@
+import os
+import queue
+import struct
+import threading
+import zlib
+
+import pygame
+from settings import *
+
+# Frame capture for QA and demo reels. The game loop copies the screen's
+# pixels straight from its buffer view into one of a few preallocated
+# buffers and hands it to a worker thread, which does all the encoding and
+# disk I/O. When the worker falls behind, frames are dropped rather than
+# making the game wait, unless the capture is told to block (offline
+# rendering, where nothing runs in real time).
+#
+# "png" writes frame_000000.png, ... and "stream" one frames.pmf file: a
+# header, then every frame as its index, length and zlib compressed pixels.
+# Stream pixels are XORed with the frame before, which leaves zeros wherever
+# nothing moved and makes the file about three times smaller. Only the
+# stream needs numpy, which the game itself doesn't.
+
+STREAM_MAGIC = b"PMFS"
+STREAM_HEADER = struct.Struct("<4sHHHBIIII")  # magic, width, height, pitch, bytes per pixel, masks
+STREAM_FRAME = struct.Struct("<II")  # frame index, compressed length
+
+
+class FrameCapture:
+
+    def __init__(self, directory, surface, kind=CAPTURE_FORMAT, queue_size=CAPTURE_QUEUE, block=False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.kind = kind
+        self.block = block
+        self.size = surface.get_size()
+        self.pitch = surface.get_pitch()
+        self.bitsize = surface.get_bitsize()
+        self.masks = surface.get_masks()
+        self.frames = 0
+        self.dropped = 0
+
+        # every buffer is either free, queued or with the worker
+        self.free = queue.Queue()
+        for _ in range(queue_size + 1):
+            self.free.put(bytearray(self.pitch * self.size[1]))
+        self.pending = queue.Queue(queue_size)
+        self.stream = None
+        if kind == "stream":
+            self.stream = open(os.path.join(directory, "frames.pmf"), "wb")
+            self.stream.write(STREAM_HEADER.pack(STREAM_MAGIC, self.size[0], self.size[1], self.pitch,
+                                                 surface.get_bytesize(), *self.masks))
+        self.worker = threading.Thread(target=self.work, daemon=True)
+        self.worker.start()
+
+    def capture(self, surface):
+        if surface.get_size() != self.size:
+            # the window was resized, frames are only kept at the first size
+            self.dropped += 1
+            return
+        try:
+            buffer = self.free.get(self.block)
+        except queue.Empty:
+            self.dropped += 1
+            return
+        view = surface.get_view('0')
+        memoryview(buffer)[:] = view
+        del view
+        self.pending.put((self.frames, buffer))
+        self.frames += 1
+
+    def work(self):
+        image = pygame.Surface(self.size, 0, self.bitsize, self.masks)
+        if self.stream is not None:
+            import numpy as np
+            previous = np.zeros(self.pitch * self.size[1], np.uint8)
+            delta = np.empty_like(previous)
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            index, buffer = item
+            if self.stream is not None:
+                frame = np.frombuffer(buffer, np.uint8)
+                np.bitwise_xor(frame, previous, out=delta)
+                previous[:] = frame
+                data = zlib.compress(delta, 1)
+                self.stream.write(STREAM_FRAME.pack(index, len(data)))
+                self.stream.write(data)
+            else:
+                image.get_buffer().write(bytes(buffer), 0)
+                pygame.image.save(image, os.path.join(self.directory, "frame_%06d.png" % index))
+            self.free.put(buffer)
+        if self.stream is not None:
+            self.stream.close()
+
+    def close(self):
+        # waits for the frames already taken to be written
+        self.pending.put(None)
+        self.worker.join()
+
+
+def read_stream(path):
+    # yields (index, surface) for every frame of a "stream" capture
+    import numpy as np
+    with open(path, "rb") as file:
+        magic, width, height, pitch, bytesize, *masks = STREAM_HEADER.unpack(file.read(STREAM_HEADER.size))
+        if magic != STREAM_MAGIC:
+            raise ValueError("%s is not a frame stream" % path)
+        frame = np.zeros(pitch * height, np.uint8)
+        while True:
+            header = file.read(STREAM_FRAME.size)
+            if len(header) < STREAM_FRAME.size:
+                return
+            index, length = STREAM_FRAME.unpack(header)
+            surface = pygame.Surface((width, height), 0, bytesize * 8, masks)
+            frame ^= np.frombuffer(zlib.decompress(file.read(length)), np.uint8)
+            surface.get_buffer().write(frame.tobytes(), 0)
+            yield index, surface
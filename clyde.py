@@ -0,0 +1,18 @@
+from ghost_state import GhostState
+
+
+class Clyde(GhostState):
+    __slots__ = ()
+    name = 'clyde'
+    slot = 2
+
+    def scatter_target(self, state):
+        return state.rows, 0
+
+    def chase_target(self, state):
+        # chases from afar, runs to his corner when closer than eight tiles
+        row, col = state.player_tile()
+        own_row, own_col = self.tile()
+        if (row - own_row) ** 2 + (col - own_col) ** 2 > 64:
+            return row, col
+        return self.scatter_target(state)
@@ -0,0 +1,113 @@
+import heapq
+from array import array
+from collections import OrderedDict, deque
+
+from settings import MAZE_CACHE_SIZE
+from maze import BITS, MOVES
+
+# Ghost path tables, built once per maze: shortest distances between every
+# pair of junction nodes the pellets connect to, and for every tile of the
+# grid the nearest tile a ghost can actually stand on.
+
+UNREACHABLE = 0xFFFF
+
+_cache = OrderedDict()
+
+
+class Distances:
+
+    def __init__(self, maze):
+        self.maze = maze
+        self.reachable = self.find_reachable()
+        self.nodes = [node for node in maze.graph if self.reachable[node]]
+        self.ids = {node: i for i, node in enumerate(self.nodes)}
+        self.count = len(self.nodes)
+        self.table = array('H', [UNREACHABLE]) * (self.count * self.count)
+        for node in self.nodes:
+            self.fill_from(node)
+        self.nearest = self.find_nearest()
+
+    def find_reachable(self):
+        # through the exits like the actors move, a walkable tile next to one
+        # across a wall, or across the wrap at the border, is not reachable
+        maze = self.maze
+        reachable = bytearray(len(maze.walkable))
+        queue = deque(tile for tile, glyph in enumerate(maze.glyphs) if glyph in b'.O')
+        for tile in queue:
+            reachable[tile] = 1
+        while queue:
+            tile = queue.popleft()
+            for key, bit in BITS.items():
+                if not maze.exits[tile] & bit:
+                    continue
+                other = maze.neighbour(tile, key)
+                if not reachable[other]:
+                    reachable[other] = 1
+                    queue.append(other)
+        return reachable
+
+    def fill_from(self, source):
+        # dijkstra over the corridors
+        best = {source: 0}
+        heap = [(0, source)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > best[node]:
+                continue
+            for _, other, length, _ in self.maze.graph[node]:
+                if distance + length < best.get(other, UNREACHABLE):
+                    best[other] = distance + length
+                    heapq.heappush(heap, (distance + length, other))
+        row = self.ids[source] * self.count
+        for node, distance in best.items():
+            self.table[row + self.ids[node]] = distance
+
+    def find_nearest(self):
+        rows, cols = self.maze.rows, self.maze.cols
+        nearest = array('i', [-1]) * (rows * cols)
+        queue = deque(tile for tile, reachable in enumerate(self.reachable) if reachable)
+        for tile in queue:
+            nearest[tile] = tile
+        while queue:
+            tile = queue.popleft()
+            row, col = divmod(tile, cols)
+            for dx, dy in MOVES.values():
+                if 0 <= row + dy < rows and 0 <= col + dx < cols:
+                    other = (row + dy) * cols + col + dx
+                    if nearest[other] == -1:
+                        nearest[other] = nearest[tile]
+                        queue.append(other)
+        return nearest
+
+    def target_tile(self, row, col):
+        # any (row, col), even off the map, to the closest reachable tile
+        row = min(max(row, 0), self.maze.rows - 1)
+        col = min(max(col, 0), self.maze.cols - 1)
+        return self.nearest[row * self.maze.cols + col]
+
+    def cost(self, node, edge, target):
+        # steps from node to target when leaving node along edge
+        key, other, length, corridor = edge
+        base = self.ids[other] * self.count
+        if target in self.ids:
+            return length + self.table[base + self.ids[target]]
+        target_corridor, a, to_a, b, to_b = self.maze.corridors[target]
+        best = length + min(self.table[base + self.ids[a]] + to_a, self.table[base + self.ids[b]] + to_b)
+        if target_corridor == corridor:
+            if a == b:
+                best = min(best, to_a, to_b)
+            else:
+                best = min(best, to_a if a == node else to_b)
+        return best
+
+
+def get_distances(maze):
+    key = maze.level_map
+    distances = _cache.get(key)
+    if distances is None:
+        distances = _cache[key] = Distances(maze)
+        if len(_cache) > MAZE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return distances
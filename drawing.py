@@ -1,56 +1,117 @@
 import pygame
 from settings import *
 from button import Button
-from level_1_sprites import *
+from fonts import render_text
+from view import view
 
-
-pygame.init()
+# Layout in logical pixels, the view scales it to the window when drawn
+HUD_RECT = pygame.Rect(WIDTH - 5 * TILE, 0, 5 * TILE, 5 * TILE // 2)
+PROFILE_RECT = pygame.Rect(WIDTH - 12 * TILE, HEIGHT - 15 * TILE // 2, 12 * TILE, 15 * TILE // 2)
+MAZE_COLS, MAZE_ROWS = 28, 31
+TUNNEL_ROW = 14
+BORDER = pygame.Rect(0, 0, MAZE_COLS * TILE, MAZE_ROWS * TILE)
+BORDER_WIDTH = TILE // 4
+# the border is cleared in front of the tunnel, a bit over a tile above and below
+TUNNEL_LEFT = pygame.Rect(0, TUNNEL_ROW * TILE - 3 * TILE // 4, 3 * TILE // 4, 5 * TILE // 2)
+TUNNEL_RIGHT = pygame.Rect((MAZE_COLS - 1) * TILE, TUNNEL_ROW * TILE - 3 * TILE // 4, TILE, 5 * TILE // 2)
 
 
 class Drawing(object):
     def __init__(self, screen):
         self.screen = screen
-        self.font = pygame.font.SysFont('Arial', 36)
 
     def drawing_main_menu(self, color_count):
-        text_surface = pygame.Surface((WIDTH, 275))
-        font = pygame.font.Font(None, 100)
-        text_pm = font.render("Pac-Man", True, (color_count, 0, 0))
-        pos = text_pm.get_rect(center=(WIDTH // 2, 275 // 2))
-        text_surface.blit(text_pm, pos)
-        self.screen.blit(text_surface, (0, 0))
+        text_pm = render_text(None, view.scale(100), "Pac-Man", (color_count, 0, 0))
+        pos = text_pm.get_rect(center=view.point((WIDTH // 2, 275 // 2)))
+        self.screen.fill(BLACK, pos)
+        self.screen.blit(text_pm, pos)
+        return pos
 
     def drawing_level_menu(self):
         self.screen.fill(BLACK)
-        font = pygame.font.Font(None, 80)
-        text_surface = pygame.Surface((WIDTH, 175))
-        text_chl = font.render("Choose level", True, WHITE)
-        pos = text_chl.get_rect(center=(WIDTH // 2, 175 // 2))
-        text_surface.blit(text_chl, pos)
-        self.screen.blit(text_surface, (0, 0))
+        text_chl = render_text(None, view.scale(80), "Choose level", WHITE)
+        pos = text_chl.get_rect(center=view.point((WIDTH // 2, 175 // 2)))
+        self.screen.blit(text_chl, pos)
 
     def drawing_button(self, button):
-        button_surface = pygame.Surface((button.width, button.height))
-        pygame.draw.rect(button_surface, button.color, (0, 0, button.width, button.height), 5, button.rounding)
-        font = pygame.font.SysFont('arial', 20)
-        text_button = font.render(button.text, True, button.color_text)
-        pos = text_button.get_rect(center=(button.width // 2, button.height // 2 - 1))
-        button_surface.blit(text_button, pos)
-        self.screen.blit(button_surface, (button.x, button.y))
-
-    def drawing_level(self, level, player):
-        if level == 1:
-            points_sprites.draw(self.screen)
-            all_sprites_1.draw(self.screen)
-            pygame.draw.rect(self.screen, BLACK, (0, 265, 15, 50))
-            pygame.draw.rect(self.screen, BLACK, (540, 265, 20, 50))
-            pygame.draw.rect(self.screen, BLUE, (0, 0, 560, 620), 5)
-
-            score = str(player.score)
-            render = self.font.render(score, False, RED)
-            self.screen.blit(render, (WIDTH - 100, 5))
+        rect = view.rect(button.rect)
+        if button.tile != view.tile:
+            # made for another window size
+            button.surfaces = {}
+            button.tile = view.tile
+        button_surface = button.surfaces.get(button.color)
+        if button_surface is None:
+            width, height = rect.size
+            button_surface = pygame.Surface((width, height)).convert()
+            button_surface.fill(BLACK)
+            pygame.draw.rect(button_surface, button.color, (0, 0, width, height), max(1, view.scale(5)),
+                             view.scale(button.rounding))
+            text_button = render_text('arial', view.scale(20), button.text, button.color_text)
+            pos = text_button.get_rect(center=(width // 2, height // 2 - 1))
+            button_surface.blit(text_button, pos)
+            button.surfaces[button.color] = button_surface
+        self.screen.blit(button_surface, rect)
+        return rect
+
+    def drawing_walls(self, walls, surface):
+        walls.draw(surface)
+        pygame.draw.rect(surface, BLACK, view.rect(TUNNEL_LEFT))
+        pygame.draw.rect(surface, BLACK, view.rect(TUNNEL_RIGHT))
+        pygame.draw.rect(surface, BLUE, view.rect(BORDER), max(1, view.scale(BORDER_WIDTH)))
+
+    def drawing_level(self, walls, player, pellet_layer, actors):
+        pellet_layer.draw(self.screen)
+        self.drawing_walls(walls, self.screen)
+        actors.draw(self.screen)
+        self.drawing_score(player)
+
+    def drawing_score(self, player):
+        score = str(player.score)
+        render = render_text('Arial', view.scale(36), score, RED, False)
+        self.screen.blit(render, view.point((WIDTH - 5 * TILE, TILE // 4)))
+
+    # Dirty rendering: the walls are drawn once into a cached background and
+    # every frame only the actors, eaten pellets and the HUD are pushed out
+
+    def drawing_level_background(self, walls, pellet_layer, actors):
+        self.walls_surface = pygame.Surface(self.screen.get_size()).convert()
+        self.walls_surface.fill(BLACK)
+        self.drawing_walls(walls, self.walls_surface)
+        self.background = self.walls_surface.copy()
+        pellet_layer.draw(self.background)
+        self.actors = actors
+        self.actors.clear(self.screen, self.background)
+        self.screen.blit(self.background, (0, 0))
+        pygame.display.flip()
+
+    def drawing_level_dirty(self, player, clock):
+        for row, col in player.eaten:
+            rect = view.rect((col * TILE, row * TILE, TILE, TILE))
+            self.background.blit(self.walls_surface, rect, rect)
+            self.actors.repaint_rect(rect)
+        rects = self.actors.draw(self.screen)
+
+        hud = view.rect(HUD_RECT)
+        self.screen.blit(self.background, hud, hud)
+        self.drawing_score(player)
+        self.drawing_fps(clock)
+        rects.append(hud)
+        return rects
+
+    def drawing_profile(self, profiler):
+        # returns the rect to update, None when there is nothing to redraw
+        if not profiler.visible and not profiler.toggled:
+            return None
+        rect = view.rect(PROFILE_RECT)
+        self.screen.fill(BLACK, rect)
+        if profiler.visible:
+            for i, line in enumerate(profiler.lines):
+                render = render_text('Courier', view.scale(16), line, GRAY, False)
+                self.screen.blit(render, view.point((PROFILE_RECT.x + 5, PROFILE_RECT.y + 5 + i * 17)))
+        profiler.toggled = False
+        return rect
 
     def drawing_fps(self, clock):
         display_fps = str(int(clock.get_fps()))
-        render = self.font.render(display_fps, False, RED)
-        self.screen.blit(render, (WIDTH - 40, 5))
+        render = render_text('Arial', view.scale(36), display_fps, RED, False)
+        self.screen.blit(render, view.point((WIDTH - 2 * TILE, TILE // 4)))
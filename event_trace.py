@@ -0,0 +1,68 @@
+import json
+import os
+import struct
+import time
+from array import array
+
+# Gameplay events in a preallocated ring buffer, the newest TRACE_EVENTS of
+# them. GameState only records when it has a trace, so a game without one
+# pays a single attribute check per event.
+
+MOVE, TURN, PELLET, POWER, WRAP, GHOST_EATEN, CAUGHT = range(7)
+NAMES = ("move", "turn", "pellet", "power", "wrap", "ghost_eaten", "caught")
+# what a and b hold for each kind
+FIELDS = (("x", "y"), ("from", "to"), ("row", "col"), ("row", "col"), ("x", "y"),
+          ("ghost", "points"), ("ghost", "lives"))
+
+RECORD = struct.Struct("<BIii")  # kind, tick, a, b
+
+
+class Trace:
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.kinds = array('B', bytes(capacity))
+        self.ticks = array('I', bytes(4 * capacity))
+        self.a = array('i', bytes(4 * capacity))
+        self.b = array('i', bytes(4 * capacity))
+        self.count = 0
+
+    def record(self, kind, tick, a=0, b=0):
+        slot = self.count % self.capacity
+        self.kinds[slot] = kind
+        self.ticks[slot] = tick
+        self.a[slot] = a
+        self.b[slot] = b
+        self.count += 1
+
+    def events(self):
+        # (kind, tick, a, b), oldest first
+        kept = min(self.count, self.capacity)
+        start = self.count - kept
+        for i in range(start, self.count):
+            slot = i % self.capacity
+            yield self.kinds[slot], self.ticks[slot], self.a[slot], self.b[slot]
+
+    def dump(self, path):
+        # JSON lines for a .jsonl path, packed records for anything else
+        if path.endswith(".jsonl"):
+            with open(path, "w") as file:
+                for kind, tick, a, b in self.events():
+                    first, second = FIELDS[kind]
+                    file.write(json.dumps({"tick": tick, "event": NAMES[kind], first: a, second: b}) + "\n")
+        else:
+            with open(path, "wb") as file:
+                file.write(b''.join(RECORD.pack(*event) for event in self.events()))
+
+
+def dump_new(trace, directory, extension=".jsonl"):
+    # into a new time stamped file, returns its path
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, time.strftime("%Y%m%d-%H%M%S") + "-%d%s" % (trace.count, extension))
+    trace.dump(path)
+    return path
+
+
+def load(path):
+    with open(path, "rb") as file:
+        return list(RECORD.iter_unpack(file.read()))
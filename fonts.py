@@ -0,0 +1,31 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+# Fonts are opened once, rendered strings are kept in a bounded LRU cache
+
+_fonts = {}
+_texts = OrderedDict()
+
+
+def get_font(name, size):
+    # name None is pygame's default font, anything else a system font
+    key = (name, size)
+    if key not in _fonts:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _fonts[key] = pygame.font.Font(None, size) if name is None else pygame.font.SysFont(name, size)
+    return _fonts[key]
+
+
+def render_text(name, size, text, color, antialias=True):
+    key = (name, size, text, color, antialias)
+    surface = _texts.get(key)
+    if surface is None:
+        surface = get_font(name, size).render(text, antialias, color)
+        _texts[key] = surface
+        if len(_texts) > TEXT_CACHE_SIZE:
+            _texts.popitem(last=False)
+    else:
+        _texts.move_to_end(key)
+    return surface
@@ -0,0 +1,82 @@
+import pygame
+from settings import *
+from assets import assets
+from view import view
+
+# Every animation frame of every direction, rotated or flipped once and
+# converted to the display format, so entities only pick one by index.
+# Built on first use since convert_alpha needs the display mode to be set.
+# Everything is made at the view's tile size and made again when the window
+# is resized to another one.
+
+
+class FrameCache:
+
+    def __init__(self):
+        self.tile = None
+        self.scaled()
+
+    def scaled(self):
+        # drops what was made for another tile size
+        if self.tile != view.tile:
+            self.tile = view.tile
+            self.images = {}
+            self.player = None
+            self.ghosts = {}
+            self.frightened = None
+
+    def image(self, name):
+        # an asset at the tile size, walls and pellets too
+        self.scaled()
+        image = self.images.get(name)
+        if image is None:
+            image = assets.image(name)
+            if self.tile != TILE:
+                size = view.scale(image.get_width()), view.scale(image.get_height())
+                if self.tile % TILE:
+                    image = pygame.transform.smoothscale(image, size)
+                else:
+                    # whole multiples keep the pixel art sharp
+                    image = pygame.transform.scale(image, size)
+            image = image.convert_alpha()
+            self.images[name] = image
+        return image
+
+    def player_frames(self):
+        # [angle // 90][animation frame]
+        self.scaled()
+        if self.player is None:
+            images = [self.image(PLAYER_ANIMATION[frame]) for frame in sorted(PLAYER_ANIMATION)]
+            self.player = [[pygame.transform.rotate(image, angle).convert_alpha() for image in images]
+                           for angle in (0, 90, 180, 270)]
+        return self.player
+
+    def ghost_frames(self, name):
+        # {direction key: [animation frame, ...]}
+        self.scaled()
+        if name not in self.ghosts:
+            images = {side: self.image(image) for side, image in GHOST_ANIMATION[name].items()}
+            self.ghosts[name] = {
+                'a': [images['front1'], images['front2']],
+                'd': [pygame.transform.flip(images['front1'], True, False),
+                      pygame.transform.flip(images['front2'], True, False)],
+                'w': [images['up'], images['up']],
+                's': [images['down'], images['down']],
+            }
+        return self.ghosts[name]
+
+    def frightened_frames(self):
+        # blinky's front frames painted blue, shared by every frightened ghost
+        self.scaled()
+        if self.frightened is None:
+            self.frightened = []
+            for image in self.ghost_frames('blinky')['a']:
+                image = image.copy()
+                pixels = pygame.PixelArray(image)
+                pixels.replace(BLINKY, BLUE)
+                pixels.close()
+                self.frightened.append(image)
+        return self.frightened
+
+
+frames = FrameCache()
@@ -0,0 +1,281 @@
+# Pure game simulation, no pygame here: the level front ends feed it plain
+# input ('a', 's', 'd', 'w' or None) and draw whatever state it ends up in.
+
+import struct
+import zlib
+
+from settings import *
+from maze import BITS, MOVES, OPPOSITE, get_maze
+from pellets import BIG, SCORES, Pellets
+from distances import get_distances
+from event_trace import CAUGHT, GHOST_EATEN, MOVE, PELLET, POWER, TURN, WRAP
+from blinky import Blinky
+from pinky import Pinky
+from inky import Inky
+from clyde import Clyde
+
+HORIZONTAL = 'ad'
+
+ANGLES = {'a': 0, 's': 90, 'd': 180, 'w': 270}
+KEYS = {0: 'a', 90: 's', 180: 'd', 270: 'w'}
+KEY_INDEX = {key: i for i, key in enumerate('asdw')}
+MODES = ('scatter', 'chase')
+
+# snapshot(): the state after its level, crc of the level map first
+SNAPSHOT = struct.Struct("<4sHIIIBBQBIIBhhHBbbB")
+SNAPSHOT_GHOST = struct.Struct("<hhBBIBB")
+SNAPSHOT_MAGIC = b"PMSS"
+SNAPSHOT_VERSION = 1
+
+
+class PlayerState:
+    __slots__ = ('x', 'y', 'angle', 'key_pressed', 'moved')
+
+    def __init__(self, pos):
+        self.x, self.y = pos
+        self.angle = 0
+        self.key_pressed = 'a'
+        self.moved = (-1, 0)
+
+    def clone(self):
+        other = PlayerState.__new__(PlayerState)
+        other.x, other.y, other.angle, other.key_pressed, other.moved = (
+            self.x, self.y, self.angle, self.key_pressed, self.moved)
+        return other
+
+
+class GameState:
+    # everything of one game in slots, the maze and distance tables are
+    # shared by every game of the level, so clone() copies a few numbers,
+    # five small objects and leaves the pellets to copy-on-write
+    __slots__ = ('maze', 'pellets', 'rows', 'cols', 'wrap_x', 'wrap_y', 'player_spawn', 'player', 'score', 'lives',
+                 'game_over', 'tick', 'eaten', 'trace', 'seed', 'random_state', 'mode', 'mode_tick',
+                 'frightened_ticks', 'ghosts_eaten', 'ghosts', 'distances')
+
+    def __init__(self, level_map, player_pos, ghosts=True, seed=0, trace=None):
+        self.maze = get_maze(level_map)
+        self.pellets = Pellets(self.maze)
+        self.rows = self.maze.rows
+        self.cols = self.maze.cols
+        self.wrap_x = (self.cols - 1) * TILE
+        self.wrap_y = (self.rows - 1) * TILE
+        self.player_spawn = player_pos
+        self.player = PlayerState(player_pos)
+        self.score = 0
+        self.lives = PLAYER_LIVES
+        self.game_over = False
+        self.tick = 0
+        self.eaten = []
+        self.trace = trace
+
+        self.seed = seed
+        self.random_state = seed & 0xFFFFFFFFFFFFFFFF
+        self.mode = GHOST_MODES[0][1]
+        self.mode_tick = 0
+        self.frightened_ticks = 0
+        self.ghosts_eaten = 0
+        self.ghosts = []
+        self.distances = None
+        if ghosts and self.maze.door is not None:
+            self.distances = get_distances(self.maze)
+            self.ghosts = [ghost(self.maze, GHOST_RELEASE[ghost.name]) for ghost in (Blinky, Pinky, Inky, Clyde)]
+
+    def random_below(self, count):
+        # 64 bit LCG, its whole state is one int so it snapshots for free
+        self.random_state = (self.random_state * 6364136223846793005 + 1442695040888963407) & 0xFFFFFFFFFFFFFFFF
+        return (self.random_state >> 33) % count
+
+    def clone(self):
+        other = GameState.__new__(GameState)
+        other.maze, other.rows, other.cols, other.wrap_x, other.wrap_y, other.player_spawn, other.distances = (
+            self.maze, self.rows, self.cols, self.wrap_x, self.wrap_y, self.player_spawn, self.distances)
+        other.score, other.lives, other.game_over, other.tick, other.seed, other.random_state = (
+            self.score, self.lives, self.game_over, self.tick, self.seed, self.random_state)
+        other.mode, other.mode_tick, other.frightened_ticks, other.ghosts_eaten = (
+            self.mode, self.mode_tick, self.frightened_ticks, self.ghosts_eaten)
+        other.pellets = self.pellets.clone()
+        other.player = self.player.clone()
+        other.ghosts = [ghost.clone() for ghost in self.ghosts]
+        other.eaten = []
+        other.trace = None
+        return other
+
+    def snapshot(self):
+        player = self.player
+        data = [SNAPSHOT.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, zlib.crc32(self.maze.glyphs), self.tick, self.score,
+                              self.lives, self.game_over, self.random_state, MODES.index(self.mode), self.mode_tick,
+                              self.frightened_ticks, self.ghosts_eaten, player.x, player.y, player.angle,
+                              KEY_INDEX[player.key_pressed], player.moved[0], player.moved[1], len(self.ghosts))]
+        for ghost in self.ghosts:
+            data.append(SNAPSHOT_GHOST.pack(ghost.x, ghost.y, KEY_INDEX[ghost.key], ghost.in_house,
+                                            ghost.release_tick, ghost.frightened, ghost.progress))
+        data.append(self.pellets.bitset())
+        return b''.join(data)
+
+    def restore(self, data):
+        # a snapshot of a game on the same level
+        (magic, version, level, self.tick, self.score, self.lives, game_over, self.random_state, mode,
+         self.mode_tick, self.frightened_ticks, self.ghosts_eaten, x, y, angle, key, dx, dy,
+         ghosts) = SNAPSHOT.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("not a game snapshot")
+        if level != zlib.crc32(self.maze.glyphs) or ghosts != len(self.ghosts):
+            raise ValueError("snapshot of another level")
+        self.game_over = bool(game_over)
+        self.mode = MODES[mode]
+        self.player = PlayerState((x, y))
+        self.player.angle, self.player.key_pressed, self.player.moved = angle, 'asdw'[key], (dx, dy)
+        offset = SNAPSHOT.size
+        for ghost in self.ghosts:
+            x, y, key, in_house, release_tick, frightened, progress = SNAPSHOT_GHOST.unpack_from(data, offset)
+            ghost.x, ghost.y, ghost.key, ghost.in_house = x, y, 'asdw'[key], bool(in_house)
+            ghost.release_tick, ghost.frightened, ghost.progress = release_tick, bool(frightened), progress
+            offset += SNAPSHOT_GHOST.size
+        self.pellets.load_bitset(data[offset:])
+        self.eaten = []
+
+    def is_next_wall(self, key_pressed):
+        player = self.player
+        wall = not self.maze.exits[player.y // TILE * self.cols + player.x // TILE] & BITS[key_pressed]
+        same_axis = (key_pressed in HORIZONTAL) == (KEYS[player.angle] in HORIZONTAL)
+        if key_pressed in HORIZONTAL:
+            along, across = player.x, player.y
+        else:
+            along, across = player.y, player.x
+        if wall:
+            return not same_axis or along % TILE == 0
+        return not same_axis and across % TILE != 0
+
+    def step(self, action=None):
+        self.eaten = []
+        if self.game_over:
+            return self.eaten
+
+        player = self.player
+        trace = self.trace
+        if trace is not None and not (0 <= player.x < self.wrap_x and 0 <= player.y < self.wrap_y):
+            trace.record(WRAP, self.tick, player.x, player.y)
+        player.x %= self.wrap_x
+        player.y %= self.wrap_y
+
+        if action is not None:
+            player.key_pressed = action
+
+        if not self.is_next_wall(player.key_pressed):
+            player.moved = MOVES[player.key_pressed]
+        elif self.is_next_wall(KEYS[player.angle]):
+            player.moved = (0, 0)
+
+        if player.moved == MOVES[player.key_pressed]:
+            if trace is not None and player.angle != ANGLES[player.key_pressed]:
+                trace.record(TURN, self.tick, player.angle, ANGLES[player.key_pressed])
+            player.angle = ANGLES[player.key_pressed]
+
+        player.x += player.moved[0]
+        player.y += player.moved[1]
+        if trace is not None and player.moved != (0, 0):
+            trace.record(MOVE, self.tick, player.x, player.y)
+
+        row, col = player.y // TILE % self.rows, player.x // TILE % self.cols
+        kind = self.pellets.eat(row * self.cols + col)
+        if kind:
+            self.score += SCORES[kind]
+            self.eaten.append((row, col))
+            if trace is not None:
+                trace.record(POWER if kind == BIG else PELLET, self.tick, row, col)
+            if kind == BIG:
+                self.frighten()
+
+        if self.ghosts:
+            self.update_ghosts()
+
+        self.tick += 1
+        return self.eaten
+
+    def player_tile(self):
+        return (self.player.y + TILE // 2) // TILE, (self.player.x + TILE // 2) // TILE
+
+    def player_direction(self):
+        return MOVES[KEYS[self.player.angle]]
+
+    def ghost(self, name):
+        for ghost in self.ghosts:
+            if ghost.name == name:
+                return ghost
+
+    def scheduled_mode(self):
+        tick = self.mode_tick
+        for ticks, mode in GHOST_MODES:
+            if tick < ticks:
+                return mode
+            tick -= ticks
+        return 'chase'
+
+    def frighten(self):
+        self.frightened_ticks = FRIGHTENED_TICKS
+        self.ghosts_eaten = 0
+        for ghost in self.ghosts:
+            if not ghost.in_house:
+                ghost.frightened = True
+                ghost.key = OPPOSITE[ghost.key]
+
+    def update_ghosts(self):
+        # the scatter/chase clock stands still while the ghosts are frightened
+        if self.frightened_ticks:
+            self.frightened_ticks -= 1
+            if not self.frightened_ticks:
+                for ghost in self.ghosts:
+                    ghost.frightened = False
+        else:
+            self.mode_tick += 1
+            mode = self.scheduled_mode()
+            if mode != self.mode:
+                self.mode = mode
+                for ghost in self.ghosts:
+                    if not ghost.in_house:
+                        ghost.key = OPPOSITE[ghost.key]
+
+        for ghost in self.ghosts:
+            ghost.update(self)
+
+        player = self.player
+        for ghost in self.ghosts:
+            if ghost.in_house or abs(ghost.x - player.x) >= TILE // 2 or abs(ghost.y - player.y) >= TILE // 2:
+                continue
+            if ghost.frightened:
+                self.ghosts_eaten += 1
+                self.score += GHOST_POINTS << (self.ghosts_eaten - 1)
+                ghost.reset(self.tick + GHOST_RESPAWN_TICKS)
+                if self.trace is not None:
+                    self.trace.record(GHOST_EATEN, self.tick, self.ghosts.index(ghost), GHOST_POINTS << (self.ghosts_eaten - 1))
+            else:
+                self.lives -= 1
+                if self.trace is not None:
+                    self.trace.record(CAUGHT, self.tick, self.ghosts.index(ghost), self.lives)
+                self.game_over = self.lives == 0
+                self.player = PlayerState(self.player_spawn)
+                self.frightened_ticks = 0
+                for other in self.ghosts:
+                    other.reset(self.tick + other.release_delay)
+                return
+
+    def checksum(self):
+        # crc of everything a replay could drift on
+        player = self.player
+        values = [self.tick, self.score, self.lives, self.mode_tick, self.frightened_ticks, self.ghosts_eaten,
+                  self.random_state,
+                  player.x, player.y, player.angle, player.key_pressed, player.moved]
+        for ghost in self.ghosts:
+            values += [ghost.x, ghost.y, ghost.key, ghost.in_house, ghost.frightened, ghost.progress]
+        return zlib.crc32(self.pellets.kinds, zlib.crc32(repr(values).encode()))
+
+    @property
+    def cleared(self):
+        return self.pellets.cleared
+
+
+def simulate(state, agent, ticks):
+    # agent(state) returns the next action, runs as fast as python allows
+    for _ in range(ticks):
+        state.step(agent(state))
+    return state
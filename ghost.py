@@ -0,0 +1,34 @@
+import pygame
+from settings import *
+from frames import frames
+from level_1_sprites import interpolate
+from view import view
+
+
+class Ghost(pygame.sprite.DirtySprite):
+
+    def __init__(self, group, ghost):
+        super().__init__(group)
+        self.ghost = ghost
+        self.animation_tick = 0
+        self.image = frames.ghost_frames(ghost.name)[ghost.key][0]
+        self.rect = self.image.get_rect(topleft=view.point((ghost.x, ghost.y)))
+        self.previous = (ghost.x, ghost.y)
+
+    def update(self):
+        self.tick()
+        self.show()
+
+    def tick(self):
+        # before every simulation step
+        self.previous = (self.ghost.x, self.ghost.y)
+        self.animation_tick = (self.animation_tick + 1) % 20
+
+    def show(self, alpha=256):
+        ghost = self.ghost
+        if ghost.frightened:
+            self.image = frames.frightened_frames()[self.animation_tick // 10]
+        else:
+            self.image = frames.ghost_frames(ghost.name)[ghost.key][self.animation_tick // 10]
+        self.rect.topleft = view.point(interpolate(self.previous, (ghost.x, ghost.y), alpha))
+        self.dirty = 1
@@ -0,0 +1,88 @@
+from abc import ABC, abstractmethod
+
+from settings import *
+from maze import MOVES, OPPOSITE
+
+# Ghost movement shared by the four ghosts, each of them only says where it
+# is heading in blinky.py, pinky.py, inky.py and clyde.py
+
+PRIORITY = {'w': 0, 'a': 1, 's': 2, 'd': 3}
+
+
+class GhostState(ABC):
+    __slots__ = ('home', 'exit', 'release_delay', 'x', 'y', 'key', 'in_house', 'release_tick', 'frightened',
+                 'progress')
+    name = None
+    slot = 0  # column of its place in the house, counted from the door
+
+    def __init__(self, maze, release_delay):
+        door_row, door_col = maze.door
+        self.home = ((door_col + self.slot) * TILE, (door_row + 2) * TILE)
+        self.exit = (door_col * TILE, (door_row - 1) * TILE)
+        self.release_delay = release_delay
+        self.reset(release_delay)
+
+    def reset(self, release_tick):
+        self.x, self.y = self.home
+        self.key = 'a'
+        self.in_house = True
+        self.release_tick = release_tick
+        self.frightened = False
+        self.progress = 0
+
+    def clone(self):
+        other = self.__class__.__new__(self.__class__)
+        other.home, other.exit, other.release_delay, other.release_tick = (
+            self.home, self.exit, self.release_delay, self.release_tick)
+        other.x, other.y, other.key, other.in_house, other.frightened, other.progress = (
+            self.x, self.y, self.key, self.in_house, self.frightened, self.progress)
+        return other
+
+    def tile(self):
+        return (self.y + TILE // 2) // TILE, (self.x + TILE // 2) // TILE
+
+    # the tile it heads for, (row, col), may be off the maze
+
+    @abstractmethod
+    def scatter_target(self, state):
+        pass
+
+    @abstractmethod
+    def chase_target(self, state):
+        pass
+
+    def update(self, state):
+        if self.in_house:
+            if state.tick >= self.release_tick:
+                self.x, self.y = self.exit
+                self.in_house = False
+            return
+        self.progress += FRIGHTENED_SPEED if self.frightened else GHOST_SPEED
+        while self.progress >= 16:
+            self.progress -= 16
+            self.move(state)
+
+    def move(self, state):
+        self.x %= state.wrap_x
+        self.y %= state.wrap_y
+        if self.x % TILE == 0 and self.y % TILE == 0:
+            node = self.y // TILE * state.cols + self.x // TILE
+            edges = state.maze.graph.get(node)
+            if edges is not None:
+                self.key = self.choose(state, node, edges)
+        dx, dy = MOVES[self.key]
+        self.x += dx
+        self.y += dy
+
+    def choose(self, state, node, edges):
+        # no turning back unless it is a dead end
+        options = [edge for edge in edges if edge[0] != OPPOSITE[self.key]] or edges
+        if self.frightened:
+            return options[state.random_below(len(options))][0]
+        if state.mode == 'scatter':
+            row, col = self.scatter_target(state)
+        else:
+            row, col = self.chase_target(state)
+        distances = state.distances
+        target = distances.target_tile(row, col)
+        return min(options, key=lambda edge: (distances.cost(node, edge, target), PRIORITY[edge[0]]))[0]
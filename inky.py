@@ -0,0 +1,18 @@
+from ghost_state import GhostState
+
+
+class Inky(GhostState):
+    __slots__ = ()
+    name = 'inky'
+    slot = -2
+
+    def scatter_target(self, state):
+        return state.rows, state.cols - 1
+
+    def chase_target(self, state):
+        # two tiles in front of the player, then as far again as blinky is from there
+        row, col = state.player_tile()
+        dx, dy = state.player_direction()
+        row, col = row + 2 * dy, col + 2 * dx
+        blinky_row, blinky_col = state.ghost('blinky').tile()
+        return 2 * row - blinky_row, 2 * col - blinky_col
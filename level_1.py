@@ -1,26 +1,139 @@
+import os
+import time
+
 import pygame
 from settings import *
-from drawing import Drawing
-from player import Player
+from player import Player, get_action
+from ghost import Ghost
+from game_state import GameState
+from level_1_sprites import PelletLayer, build_walls, resize_actors
+from replay import Recorder, new_recording
+from event_trace import Trace, dump_new
+from capture import FrameCapture
+from scenes import FramePacer, Scene
+
+
+class LevelScene(Scene):
+    name = "level"
+
+    def __init__(self, manager, level_map, caption, player_spawn=PLAYER_SPAWN, replayer=None, speed=1, render=None):
+        # replayer plays a recorded game back at speed times the normal rate,
+        # render is a directory to render every tick into, as fast as it goes
+        super().__init__(manager)
+        self.caption = caption
+        # one tick a frame without the fixed timestep, so frames go at speed
+        self.fps = FPS if FIXED_TIMESTEP else FPS * speed
+        self.replayer = replayer
+        self.render = render
+        if render is not None:
+            self.fps = 0
+            self.capture = FrameCapture(render, manager.screen, block=True)
+        elif CAPTURE_DIR:
+            directory = os.path.join(CAPTURE_DIR, time.strftime("%Y%m%d-%H%M%S"))
+            self.capture = FrameCapture(directory, manager.screen)
+        else:
+            self.capture = None
+        if FIXED_TIMESTEP and render is None:
+            # ticks are timed in ns, frames come as often as the pacer says
+            self.tick_ns = int(1e9 / (TICK_RATE * speed))
+            # a fast replay owes that many more ticks every frame
+            self.max_ticks = int(MAX_TICKS_PER_FRAME * max(1, speed))
+            self.pacer = FramePacer(self.fps)
+            self.last = None
+            self.behind = 0
+        if replayer is not None:
+            self.state = replayer.state
+            self.controls = replayer
+        else:
+            self.state = GameState(level_map, player_spawn)
+            self.controls = Recorder(new_recording(), self.state, get_action) if REPLAY_DIR else get_action
+        if TRACE_EVENTS:
+            self.state.trace = Trace(TRACE_EVENTS)
+
+        self.level_map = level_map
+        self.walls = build_walls(level_map)
+        self.pellet_layer = PelletLayer(self.state.pellets)
+        self.actors = pygame.sprite.LayeredDirty()
+        self.player = Player(self.actors, self.state, self.pellet_layer, self.controls)
+        self.ghosts = [Ghost(self.actors, ghost) for ghost in self.state.ghosts]
+
+    def enter(self):
+        self.last = None
+        if DIRTY_RENDERING:
+            self.manager.drawer.drawing_level_background(self.walls, self.pellet_layer, self.actors)
+
+    def leave(self):
+        if isinstance(self.controls, Recorder):
+            self.controls.close()
+        if self.capture is not None:
+            self.capture.close()
+            if self.capture.dropped:
+                print("capture dropped %d of %d frames" %
+                      (self.capture.dropped, self.capture.frames + self.capture.dropped))
+
+    def crashed(self):
+        if self.state.trace is not None:
+            print("trace written to", dump_new(self.state.trace, TRACE_DIR))
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F9 and self.state.trace is not None:
+            print("trace written to", dump_new(self.state.trace, TRACE_DIR))
+
+    def resized(self):
+        # walls and pellets are built at the tile size, so again at the new one
+        self.walls = build_walls(self.level_map)
+        self.pellet_layer = self.player.pellet_layer = PelletLayer(self.state.pellets)
+        resize_actors(self.actors)
+        if DIRTY_RENDERING:
+            self.manager.drawer.drawing_level_background(self.walls, self.pellet_layer, self.actors)
 
+    def ticks_due(self):
+        # simulation ticks owed since the last frame and how far, in 1/256,
+        # the frame is into the next one
+        if not FIXED_TIMESTEP or self.render is not None:
+            return 1, 256
+        now = time.perf_counter_ns()
+        if self.last is None:
+            self.last = now - self.tick_ns
+        self.behind += now - self.last
+        self.last = now
+        ticks, self.behind = divmod(self.behind, self.tick_ns)
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+        return ticks, self.behind * 256 // self.tick_ns
 
-def level_1_main():
-    clock = pygame.time.Clock()
-    player = Player(all_sprites_1, (270, 340))
+    def finished(self):
+        return self.state.game_over or self.replayer is not None and self.replayer.finished
 
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Level 1")
-    drawer = Drawing(screen)
+    def update(self):
+        ticks, alpha = self.ticks_due()
+        self.player.eaten = []
+        for _ in range(ticks):
+            if self.finished():
+                break
+            self.player.tick()
+            for ghost in self.ghosts:
+                ghost.tick()
+            self.player.step()
+        self.player.show(alpha)
+        for ghost in self.ghosts:
+            ghost.show(alpha)
 
-    while True:
-        screen.fill(BLACK)
+        if self.finished():
+            self.manager.pop()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                exit()
+    def draw(self):
+        rects = self.draw_frame()
+        if self.capture is not None:
+            # before the profiler overlay goes on top
+            self.capture.capture(self.manager.screen)
+        return rects
 
-        drawer.drawing_level(1, player)
-        drawer.drawing_fps(clock)
-        player.update()
-        pygame.display.flip()
-        clock.tick(FPS)
+    def draw_frame(self):
+        drawer = self.manager.drawer
+        if DIRTY_RENDERING:
+            return drawer.drawing_level_dirty(self.player, self.manager.clock)
+        self.manager.screen.fill(BLACK)
+        drawer.drawing_level(self.walls, self.player, self.pellet_layer, self.actors)
+        drawer.drawing_fps(self.manager.clock)
+        return None
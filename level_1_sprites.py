@@ -1,30 +1,59 @@
 import pygame
 
 from settings import *
+from frames import frames
+from pellets import GLYPHS
+from view import view
 
 
 class Wall(pygame.sprite.Sprite):
 
-    def __init__(self, group, x, y):
+    def __init__(self, group, glyph, x, y):
         super().__init__(group)
-        self.image = WALLS_NUMBERS[level_1_map[x][y]]
-        self.rect = self.image.get_rect()
-        self.rect.x = y * TILE
-        self.rect.y = x * TILE
+        self.image = frames.image(WALLS_NUMBERS[glyph])
+        self.rect = view.rect((y * TILE, x * TILE, TILE, TILE))
 
-class Point(pygame.sprite.Sprite):
 
-    def __init__(self, group, x, y):
-        super().__init__(group)
-        self.image = POINTS_NUMBERS[level_1_map[x][y]]
-        self.rect = self.image.get_rect()
-        self.rect.x = y * TILE
-        self.rect.y = x * TILE
-
-
-for x in range(len(level_1_map)):
-    for y in range(len(level_1_map[0])):
-        if level_1_map[x][y] not in '.-O ':
-            Wall(all_sprites_1, x, y)
-        if level_1_map[x][y] == '.' or level_1_map[x][y] == 'O':
-            Point(points_sprites, x, y)
+class PelletLayer:
+    # at the view's tile size, built again when that changes
+
+    def __init__(self, pellets):
+        rows = len(pellets.kinds) // pellets.cols
+        tile = view.tile
+        self.surface = pygame.Surface((pellets.cols * tile, rows * tile), pygame.SRCALPHA)
+        for row, col, kind in pellets.tiles():
+            self.surface.blit(frames.image(POINTS_NUMBERS[GLYPHS[kind]]), (col * tile, row * tile))
+
+    def erase(self, row, col):
+        tile = view.tile
+        rect = pygame.Rect(col * tile, row * tile, tile, tile)
+        self.surface.fill((0, 0, 0, 0), rect)
+        return rect
+
+    def draw(self, screen):
+        screen.blit(self.surface, view.point((0, 0)))
+
+
+def interpolate(previous, current, alpha):
+    # alpha in 1/256 of a tick, wrapping through the tunnel or respawning
+    # jumps straight to the new place
+    (x0, y0), (x1, y1) = previous, current
+    if abs(x1 - x0) > TILE or abs(y1 - y0) > TILE:
+        return current
+    return x0 + (x1 - x0) * alpha // 256, y0 + (y1 - y0) * alpha // 256
+
+
+def resize_actors(actors):
+    # after the tile size changed, each actor is shown once with its new image
+    for actor in actors:
+        actor.show()
+        actor.rect.size = actor.image.get_size()
+
+
+def build_walls(level_map):
+    walls = pygame.sprite.Group()
+    for x in range(len(level_map)):
+        for y in range(len(level_map[0])):
+            if level_map[x][y] not in '.-O ':
+                Wall(walls, level_map[x][y], x, y)
+    return walls
@@ -0,0 +1,122 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+
+from settings import *
+from maze import BITS, get_maze
+
+# Levels live in levels/*.txt: "key value" header lines, a blank line, then
+# the map rows. A level is compiled once into a binary artifact holding the
+# tile grid, spawn point and the maze tables (exits, node graph, corridors),
+# kept in ASSETS_CACHE_DIR under the hash of the source, and mapped back in
+# with mmap, so entering a level doesn't parse or rebuild anything.
+
+LEVELS_DIR = "levels"
+LEVEL_FILES = {"Level %d" % number: os.path.join(LEVELS_DIR, "level_%d.txt" % number) for number in range(2, 6)}
+
+MAGIC = b"PMLV"
+VERSION = 1
+KEYS = tuple(BITS)
+
+# magic, version, rows, cols, player x, player y, nodes, edges, corridor tiles
+HEADER = struct.Struct("<4sHHHHHHHH")  # then a 32 byte name
+NODE = struct.Struct("<H")
+EDGE = struct.Struct("<HBHHh")  # node, key, other node, length, corridor
+CORRIDOR = struct.Struct("<HhHHHH")  # tile, corridor, node, steps, other node, steps
+
+_cache = {}
+
+
+class Level:
+
+    def __init__(self, name, level_map, player_spawn, maze):
+        self.name = name
+        self.level_map = level_map
+        self.player_spawn = player_spawn
+        self.maze = maze
+
+
+def parse_level(source):
+    header, _, body = source.replace('\r\n', '\n').partition('\n\n')
+    fields = dict(line.split(None, 1) for line in header.splitlines() if line.strip())
+    rows = body.rstrip('\n').split('\n')
+    # editors like to eat the trailing spaces of the tunnel row
+    cols = max(len(row) for row in rows)
+    level_map = [row.ljust(cols) for row in rows]
+    player_spawn = tuple(int(value) for value in fields.get("player", "%d %d" % PLAYER_SPAWN).split())
+    return fields.get("name", ""), level_map, player_spawn
+
+
+def compile_level(source):
+    name, level_map, (player_x, player_y) = parse_level(source)
+    maze = get_maze(level_map)
+    edges = [(node, KEYS.index(key), other, length, corridor)
+             for node, node_edges in maze.graph.items() for key, other, length, corridor in node_edges]
+
+    data = bytearray(HEADER.pack(MAGIC, VERSION, maze.rows, maze.cols, player_x, player_y,
+                                 len(maze.graph), len(edges), len(maze.corridors)))
+    data += name.encode().ljust(32, b'\0')[:32]
+    data += maze.glyphs
+    data += maze.exits.tobytes()
+    for node in maze.graph:
+        data += NODE.pack(node)
+    for edge in edges:
+        data += EDGE.pack(*edge)
+    for tile, corridor in maze.corridors.items():
+        data += CORRIDOR.pack(tile, *corridor)
+    return bytes(data)
+
+
+def read_level(buffer):
+    view = memoryview(buffer)
+    magic, version, rows, cols, player_x, player_y, nodes, edges, corridors = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a compiled level")
+    offset = HEADER.size
+    name = bytes(view[offset:offset + 32]).rstrip(b'\0').decode()
+    offset += 32
+    size = rows * cols
+    glyphs = bytes(view[offset:offset + size]).decode('ascii')
+    level_map = [glyphs[row * cols:(row + 1) * cols] for row in range(rows)]
+    offset += size
+    exits = array('B', view[offset:offset + size])
+    offset += size
+
+    graph = {}
+    for (node,) in NODE.iter_unpack(view[offset:offset + nodes * NODE.size]):
+        graph[node] = []
+    offset += nodes * NODE.size
+    for node, key, other, length, corridor in EDGE.iter_unpack(view[offset:offset + edges * EDGE.size]):
+        graph[node].append((KEYS[key], other, length, corridor))
+    offset += edges * EDGE.size
+    corridor_tiles = {}
+    for tile, *corridor in CORRIDOR.iter_unpack(view[offset:offset + corridors * CORRIDOR.size]):
+        corridor_tiles[tile] = tuple(corridor)
+    view.release()
+
+    maze = get_maze(level_map, (exits, graph, corridor_tiles))
+    return Level(name, level_map, (player_x, player_y), maze)
+
+
+def load_level(path):
+    with open(path, 'rb') as file:
+        source = file.read()
+    key = hashlib.sha1(b"%d\n" % VERSION + source).hexdigest()
+    if key in _cache:
+        return _cache[key]
+
+    if not ASSETS_CACHE_DIR:
+        level = read_level(compile_level(source.decode()))
+    else:
+        artifact = os.path.join(ASSETS_CACHE_DIR, "levels", key + ".lvl")
+        if not os.path.exists(artifact):
+            os.makedirs(os.path.dirname(artifact), exist_ok=True)
+            with open(artifact + ".tmp", 'wb') as file:
+                file.write(compile_level(source.decode()))
+            os.replace(artifact + ".tmp", artifact)
+        with open(artifact, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            level = read_level(buffer)
+    _cache[key] = level
+    return level
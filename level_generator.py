@@ -0,0 +1,267 @@
+import random
+from collections import deque
+
+from settings import PLAYER_SPAWN, TILE
+
+# Symmetric mazes in the shape of level 1: same size, same ghost house,
+# tunnel and player spawn, random corridors. Corridors run along a lattice of
+# rows and columns at least three tiles apart, so walls are always two tiles
+# thick, and are picked with a randomised Kruskal over mirrored pairs of
+# lattice segments, so every maze is connected and left-right symmetric.
+
+ROWS = 31
+COLS = 28
+LATTICE_COLS = (1, 6, 9, 12, 15, 18, 21, 26)
+TUNNEL_ROW = 14
+HOUSE_TOP, HOUSE_LEFT = 12, 10
+HOUSE = (
+    b"611--117",
+    b"4      2",
+    b"4      2",
+    b"4      2",
+    b"53333338",
+)
+RING = (11, 17, 9, 18)  # rows and columns of the corridor around the house
+POWER_PELLETS = ((3, 1), (23, 1))  # and their mirror images
+EXTRA_SEGMENTS = 0.2  # chance of keeping a segment the spanning tree left out
+
+# Auto-tiling: every wall tile gets a byte with a bit per open neighbour and
+# one translate() turns a whole row of those into glyphs. A wall open both
+# above and below can't happen with two tile thick walls, so that value
+# marks the corridor tiles.
+UP, DOWN, LEFT, RIGHT, UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = (1 << bit for bit in range(8))
+CORRIDOR = UP | DOWN
+
+
+def wall_glyph(mask):
+    if mask == CORRIDOR:
+        return '.'
+    sides = (
+        (UP | LEFT, '6'), (UP | RIGHT, '7'), (DOWN | LEFT, '5'), (DOWN | RIGHT, '8'),
+        (UP, '1'), (DOWN, '3'), (LEFT, '4'), (RIGHT, '2'),
+        (DOWN_RIGHT, 'b'), (DOWN_LEFT, 'c'), (UP_RIGHT, 'a'), (UP_LEFT, 'd'),
+    )
+    for sides_mask, glyph in sides:
+        if mask & sides_mask == sides_mask:
+            return glyph
+    return ' '
+
+
+WALL_GLYPHS = bytes(ord(wall_glyph(mask)) for mask in range(256))
+ROW_BITS = (COLS + 2) * 8
+ROW_MASK = (1 << ROW_BITS) - 1
+ONES = int.from_bytes(b'\x01' * (COLS + 2), 'big')
+
+_lattices = {}
+
+
+def in_house(row, col):
+    return HOUSE_TOP <= row < HOUSE_TOP + len(HOUSE) and HOUSE_LEFT <= col < HOUSE_LEFT + len(HOUSE[0])
+
+
+def lattice_rows(rnd):
+    # 1, 11, 14, 17 and 29 are fixed, the gaps are split into steps of 3 to 5
+    rows = [1]
+    for end in (11, 14, 17, 29):
+        while end - rows[-1] > 5:
+            rows.append(rows[-1] + rnd.choice([step for step in (3, 4) if end - rows[-1] - step >= 3]))
+        rows.append(end)
+    return tuple(rows)
+
+
+class Lattice:
+    # segments for one choice of lattice rows, shared by every maze using it
+
+    def __init__(self, rows):
+        self.points = [(row, col) for row in rows for col in LATTICE_COLS if not in_house(row, col)]
+        ids = {point: i for i, point in enumerate(self.points)}
+
+        # mirrored pairs of segments as ([(point id, point id), ...], [tile, ...])
+        groups = {}
+        for row, col in self.points:
+            neighbours = []
+            if col != LATTICE_COLS[-1]:
+                neighbours.append((row, LATTICE_COLS[LATTICE_COLS.index(col) + 1]))
+            if row != rows[-1]:
+                neighbours.append((rows[rows.index(row) + 1], col))
+            for other in neighbours:
+                tiles = tiles_between((row, col), other)
+                if other not in ids or any(in_house(*tile) for tile in tiles):
+                    continue
+                mirror = ((other[0], COLS - 1 - other[1]), (row, COLS - 1 - col))
+                key = min(((row, col), other), mirror)
+                segments, group_tiles = groups.setdefault(key, (set(), set()))
+                segments.update(((ids[(row, col)], ids[other]), (ids[mirror[0]], ids[mirror[1]])))
+                group_tiles.update(r * COLS + c for r, c in tiles + tiles_between(*mirror))
+        self.forced = []
+        self.optional = []
+        for key, (segments, tiles) in sorted(groups.items()):
+            group = (sorted(segments), sorted(tiles))
+            (self.forced if is_forced(key) else self.optional).append(group)
+        self.tunnel = (ids[(TUNNEL_ROW, LATTICE_COLS[0])], ids[(TUNNEL_ROW, LATTICE_COLS[-1])])
+
+
+def get_lattice(rows):
+    if rows not in _lattices:
+        _lattices[rows] = Lattice(rows)
+    return _lattices[rows]
+
+
+def tiles_between(a, b):
+    (a_row, a_col), (b_row, b_col) = a, b
+    if a_row == b_row:
+        return [(a_row, col) for col in range(min(a_col, b_col), max(a_col, b_col) + 1)]
+    return [(row, a_col) for row in range(min(a_row, b_row), max(a_row, b_row) + 1)]
+
+
+def is_forced(segment):
+    # the ring around the house and the way into the tunnel
+    (a_row, a_col), (b_row, b_col) = segment
+    if a_row == b_row:
+        return (a_row in RING[:2] and RING[2] <= a_col and b_col <= RING[3] or
+                a_row == TUNNEL_ROW and b_col <= LATTICE_COLS[1])
+    return a_col in RING[2:] and RING[0] <= a_row and b_row <= RING[1]
+
+
+def generate_layout(seed):
+    # bytearray with 1 for every corridor tile and whether the lattice came
+    # out connected, which the randomised Kruskal guarantees
+    rnd = random.Random(seed)
+    lattice = get_lattice(lattice_rows(rnd))
+    parent = list(range(len(lattice.points)))
+
+    def find(point):
+        while parent[point] != point:
+            parent[point] = parent[parent[point]]
+            point = parent[point]
+        return point
+
+    chosen = list(lattice.forced)
+    for segments, _ in lattice.forced:
+        for a, b in segments:
+            parent[find(a)] = find(b)
+
+    optional = list(lattice.optional)
+    rnd.shuffle(optional)
+    left_out = []
+    for group in optional:
+        if any(find(a) != find(b) for a, b in group[0]):
+            chosen.append(group)
+            for a, b in group[0]:
+                parent[find(a)] = find(b)
+        elif rnd.random() < EXTRA_SEGMENTS:
+            chosen.append(group)
+        else:
+            left_out.append(group)
+
+    # no dead ends: a lattice point with a single corridor gets another one
+    degree = [0] * len(lattice.points)
+    for point in lattice.tunnel:
+        degree[point] += 1
+    for segments, _ in chosen:
+        for a, b in segments:
+            degree[a] += 1
+            degree[b] += 1
+    for point, count in enumerate(degree):
+        if count != 1:
+            continue
+        for group in left_out:
+            if any(point in segment for segment in group[0]):
+                left_out.remove(group)
+                chosen.append(group)
+                for a, b in group[0]:
+                    degree[a] += 1
+                    degree[b] += 1
+                break
+
+    grid = bytearray(ROWS * COLS)
+    for _, tiles in chosen:
+        for tile in tiles:
+            grid[tile] = 1
+    grid[TUNNEL_ROW * COLS] = grid[TUNNEL_ROW * COLS + COLS - 1] = 1
+    root = find(0)
+    return grid, all(find(point) == root for point in range(len(parent)))
+
+
+def is_connected(grid):
+    # every corridor tile reachable from the player spawn, tunnel included
+    start = (PLAYER_SPAWN[1] // TILE) * COLS + PLAYER_SPAWN[0] // TILE
+    if not grid[start]:
+        return False
+    seen = bytearray(len(grid))
+    seen[start] = 1
+    queue = deque([start])
+    count = 1
+    while queue:
+        tile = queue.popleft()
+        row, col = divmod(tile, COLS)
+        for other in (tile - COLS if row else -1, tile + COLS if row < ROWS - 1 else -1,
+                      row * COLS + (col - 1) % COLS, row * COLS + (col + 1) % COLS):
+            if other >= 0 and grid[other] and not seen[other]:
+                seen[other] = 1
+                count += 1
+                queue.append(other)
+    return count == grid.count(1)
+
+
+def auto_tile(grid):
+    # corridor layout to map rows in the glyphs of settings.level_1_map
+    padding = [0]
+    rows = padding + [int.from_bytes(b'\0' + grid[row * COLS:(row + 1) * COLS] + b'\0', 'big')
+                      for row in range(ROWS)] + padding
+    lines = []
+    for row in range(1, ROWS + 1):
+        above, current, below = rows[row - 1], rows[row], rows[row + 1]
+        masks = (above | below << 1 | current >> 8 << 2 | current << 8 << 3 |
+                 above >> 8 << 4 | above << 8 << 5 | below >> 8 << 6 | below << 8 << 7) & ROW_MASK
+        masks = masks & ~(current * 0xFF) | current * CORRIDOR
+        lines.append(bytearray(masks.to_bytes(COLS + 2, 'big')[1:-1].translate(WALL_GLYPHS)))
+
+    # no pellets around the house or in the tunnel, the four power pellets
+    # go to the pellets closest to where level 1 has them
+    for row in range(RING[0], RING[1] + 1):
+        lines[row][RING[2]:RING[3] + 1] = lines[row][RING[2]:RING[3] + 1].replace(b'.', b' ')
+    tunnel = lines[TUNNEL_ROW]
+    tunnel[:LATTICE_COLS[1]] = tunnel[:LATTICE_COLS[1]].replace(b'.', b' ')
+    tunnel[LATTICE_COLS[-2] + 1:] = tunnel[LATTICE_COLS[-2] + 1:].replace(b'.', b' ')
+    for target in POWER_PELLETS:
+        row, col = nearest_pellet(lines, target)
+        lines[row][col] = lines[row][COLS - 1 - col] = ord('O')
+
+    for offset, house_row in enumerate(HOUSE):
+        lines[HOUSE_TOP + offset][HOUSE_LEFT:HOUSE_LEFT + len(house_row)] = house_row
+    return [line.decode() for line in lines]
+
+
+def nearest_pellet(lines, target):
+    # closest pellet in the left half, rings of growing manhattan distance
+    target_row, target_col = target
+    for distance in range(ROWS + COLS):
+        for row in range(target_row - distance, target_row + distance + 1):
+            if not 0 <= row < ROWS:
+                continue
+            offset = distance - abs(row - target_row)
+            for col in (target_col - offset, target_col + offset):
+                if 0 <= col < COLS // 2 and lines[row][col] == ord('.'):
+                    return row, col
+
+
+def generate_level(seed):
+    # reproducible level map for a seed, drops in wherever level_1_map goes
+    while True:
+        grid, connected = generate_layout(seed)
+        # the union-find only joins lattice points, the tiles are checked too
+        if connected and is_connected(grid):
+            return auto_tile(grid)
+        seed = random.Random(seed).getrandbits(32)
+
+
+def screen_layouts(count, seed=0):
+    # fast path for offline screening, yields (seed, layout) of connected
+    # layouts without tiling them, auto_tile() the ones worth keeping
+    rnd = random.Random(seed)
+    for _ in range(count):
+        layout_seed = rnd.getrandbits(32)
+        grid, connected = generate_layout(layout_seed)
+        if connected:
+            yield layout_seed, grid
@@ -1,88 +1,38 @@
-import pygame
+import random
+
 from settings import *
 from button import Button
-from drawing import Drawing
-from level_1 import level_1_main
-
-pygame.init()
-
-
-def back_to_menu():
-    from main_menu import main_menu
-    main_menu()
-
-
-def level_menu_main():
-    clock = pygame.time.Clock()
-
-    def get_buttons_drawn():
-        drawer.drawing_button(button_lev1)
-        drawer.drawing_button(button_lev2)
-        drawer.drawing_button(button_lev3)
-        drawer.drawing_button(button_lev4)
-        drawer.drawing_button(button_lev5)
-        drawer.drawing_button(button_generate)
-        drawer.drawing_button(button_back)
-
-    def get_buttons_motion():
-        flag_level1 = button_lev1.motion()
-        flag_level2 = button_lev2.motion()
-        flag_level3 = button_lev3.motion()
-        flag_level4 = button_lev4.motion()
-        flag_level5 = button_lev5.motion()
-        flag_generate = button_generate.motion()
-        flag_back = button_back.motion()
-        return {"Level 1": flag_level1,
-                "Level 2": flag_level2,
-                "Level 3": flag_level3,
-                "Level 4": flag_level4,
-                "Level 5": flag_level5,
-                "Generate level": flag_generate,
-                "Back": flag_back
-                }
-
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Pac-Man")
-    drawer = Drawing(screen)
-
-    button_lev1 = Button((300, 193), 200, 40, "Level 1", 15)
-    button_lev2 = Button((300, 253), 200, 40, "Level 2", 15)
-    button_lev3 = Button((300, 313), 200, 40, "Level 3", 15)
-    button_lev4 = Button((300, 373), 200, 40, "Level 4", 15)
-    button_lev5 = Button((300, 433), 200, 40, "Level 5", 15)
-    button_generate = Button((300, 533), 200, 40, "Generate level", 15)
-    button_back = Button((300, 683), 200, 40, "Back", 15)
-
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                exit()
-
-        drawer.drawing_level_menu()
-        get_buttons_drawn()
-        dict_flags = get_buttons_motion()
-
-        pygame.display.flip()
-        clock.tick(FPS)
-
-        if dict_flags["Level 1"]:
-            flag_next_start = "Level 1"
-            break
-        elif dict_flags["Level 2"]:
-            pass
-        elif dict_flags["Level 3"]:
-            pass
-        elif dict_flags["Level 4"]:
-            pass
-        elif dict_flags["Level 5"]:
-            pass
-        elif dict_flags["Generate level"]:
-            pass
-        elif dict_flags["Back"]:
-            flag_next_start = "Back"
-            break
-
-    if flag_next_start == "Back":
-        back_to_menu()
-    elif flag_next_start == "Level 1":
-        level_1_main()
+from scenes import MenuScene
+from level_1 import LevelScene
+from level_generator import generate_level
+from level_files import LEVEL_FILES, load_level
+
+
+class LevelMenu(MenuScene):
+    name = "level_menu"
+
+    def __init__(self, manager):
+        super().__init__(manager, {
+            "Level 1": Button((300, 193), 200, 40, "Level 1", 15),
+            "Level 2": Button((300, 253), 200, 40, "Level 2", 15),
+            "Level 3": Button((300, 313), 200, 40, "Level 3", 15),
+            "Level 4": Button((300, 373), 200, 40, "Level 4", 15),
+            "Level 5": Button((300, 433), 200, 40, "Level 5", 15),
+            "Generate level": Button((300, 533), 200, 40, "Generate level", 15),
+            "Back": Button((300, 683), 200, 40, "Back", 15),
+        })
+
+    def press(self, name):
+        if name == "Back":
+            self.manager.pop()
+        elif name == "Level 1":
+            self.manager.push(LevelScene(self.manager, level_1_map, "Level 1"))
+        elif name in LEVEL_FILES:
+            level = load_level(LEVEL_FILES[name])
+            self.manager.push(LevelScene(self.manager, level.level_map, level.name, level.player_spawn))
+        elif name == "Generate level":
+            seed = random.getrandbits(32)
+            self.manager.push(LevelScene(self.manager, generate_level(seed), "Generated level %d" % seed))
+
+    def draw_background(self):
+        self.manager.drawer.drawing_level_menu()
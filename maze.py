@@ -0,0 +1,108 @@
+from array import array
+from collections import OrderedDict
+
+from settings import MAZE_CACHE_SIZE
+
+# Level map compiled once into flat tables, tiles are indexed row * cols + col
+
+PASSABLE = ' O.'
+
+MOVES = {'a': (-1, 0), 's': (0, 1), 'd': (1, 0), 'w': (0, -1)}
+BITS = {'a': 1, 's': 2, 'd': 4, 'w': 8}
+OPPOSITE = {'a': 'd', 's': 'w', 'd': 'a', 'w': 's'}
+CORRIDORS = (BITS['a'] | BITS['d'], BITS['s'] | BITS['w'])
+
+_cache = OrderedDict()
+
+
+class Maze:
+
+    def __init__(self, level_map, tables=None):
+        # tables is (exits, graph, corridors) from a compiled level file,
+        # built here when there is none
+        self.level_map = tuple(level_map)
+        self.rows = len(level_map)
+        self.cols = len(level_map[0])
+        self.glyphs = bytearray(''.join(level_map), 'ascii')
+        self.walkable = array('B', (glyph in PASSABLE for glyph in ''.join(level_map)))
+
+        if tables is not None:
+            self.exits, self.graph, self.corridors = tables
+        else:
+            # exits use the same neighbours the old string indexing looked at,
+            # negative indices wrapping to the opposite side
+            self.exits = array('B', bytes(self.rows * self.cols))
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    mask = 0
+                    for key, (dx, dy) in MOVES.items():
+                        if self.walkable[(row + dy) % self.rows * self.cols + (col + dx) % self.cols]:
+                            mask |= BITS[key]
+                    self.exits[row * self.cols + col] = mask
+
+            self.corridors = {}
+            self.graph = self.build_graph()
+
+        # ghosts leave their house through the tile above the door
+        door = self.glyphs.find(b'-')
+        self.door = divmod(door, self.cols) if door != -1 else None
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def is_wall(self, row, col):
+        return not self.walkable[row * self.cols + col]
+
+    def can_move(self, row, col, key):
+        return bool(self.exits[row * self.cols + col] & BITS[key])
+
+    def is_junction(self, row, col):
+        index = row * self.cols + col
+        return self.walkable[index] and self.exits[index] not in CORRIDORS
+
+    def neighbour(self, index, key):
+        # positions wrap one tile short of the map edge, like the player does
+        row, col = divmod(index, self.cols)
+        dx, dy = MOVES[key]
+        return (row + dy) % (self.rows - 1) * self.cols + (col + dx) % (self.cols - 1)
+
+    def build_graph(self):
+        # junctions and corners are nodes, straight corridors between them are
+        # edges: {node: [(key, other node, length, corridor), ...]}. Tiles
+        # inside a corridor go to self.corridors as
+        # {tile: (corridor, node, steps to it, other node, steps to it)},
+        # a corridor is numbered by its smallest tile, -1 when it has none
+        graph = {}
+        for index, walkable in enumerate(self.walkable):
+            row, col = divmod(index, self.cols)
+            if walkable and row < self.rows - 1 and col < self.cols - 1 and self.exits[index] not in CORRIDORS:
+                graph[index] = []
+        for node, edges in graph.items():
+            for key, bit in BITS.items():
+                if not self.exits[node] & bit:
+                    continue
+                tiles = []
+                current = self.neighbour(node, key)
+                while current not in graph and self.walkable[current] and len(tiles) < len(self.walkable):
+                    tiles.append(current)
+                    current = self.neighbour(current, key)
+                if current not in graph:
+                    continue
+                corridor = min(tiles) if tiles else -1
+                length = len(tiles) + 1
+                edges.append((key, current, length, corridor))
+                for steps, tile in enumerate(tiles, 1):
+                    self.corridors[tile] = (corridor, node, steps, current, length - steps)
+        return graph
+
+
+def get_maze(level_map, tables=None):
+    key = tuple(level_map)
+    maze = _cache.get(key)
+    if maze is None:
+        maze = _cache[key] = Maze(level_map, tables)
+        if len(_cache) > MAZE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return maze
@@ -0,0 +1,69 @@
+# Pellets of one game kept as a byte per tile, 0 for an empty tile. Clones
+# share the bytes until one of them eats something.
+
+SMALL = 1
+BIG = 2
+
+GLYPHS = {SMALL: '.', BIG: 'O'}
+SCORES = {SMALL: 10, BIG: 50}
+
+_KINDS = bytes(SMALL if glyph == ord('.') else BIG if glyph == ord('O') else 0 for glyph in range(256))
+_BITS = bytes(b'01'[kind != 0] for kind in range(256))  # kinds to ascii bits
+_MASK = bytes.maketrans(b'01', b'\x00\xff')
+
+
+class Pellets:
+    __slots__ = ('cols', 'start', 'kinds', 'remaining', 'shared')
+
+    def __init__(self, maze):
+        self.cols = maze.cols
+        self.start = bytes(maze.glyphs.translate(_KINDS))
+        self.kinds = bytearray(self.start)
+        self.remaining = len(self.kinds) - self.kinds.count(0)
+        self.shared = False
+
+    def clone(self):
+        other = Pellets.__new__(Pellets)
+        other.cols = self.cols
+        other.start = self.start
+        other.kinds = self.kinds
+        other.remaining = self.remaining
+        other.shared = self.shared = True
+        return other
+
+    def bitset(self):
+        # a bit per tile, set where a pellet is left, tile 0 the lowest bit
+        bits = int(self.kinds.translate(_BITS)[::-1], 2)
+        return bits.to_bytes((len(self.kinds) + 7) // 8, 'little')
+
+    def load_bitset(self, data):
+        # the pellets of the level that are in the bitset
+        size = len(self.kinds)
+        mask = format(int.from_bytes(data, 'little'), '0%db' % size)[::-1].encode().translate(_MASK)
+        kinds = int.from_bytes(self.start, 'big') & int.from_bytes(mask, 'big')
+        self.kinds = bytearray(kinds.to_bytes(size, 'big'))
+        self.remaining = size - self.kinds.count(0)
+        self.shared = False
+
+    def kind(self, row, col):
+        return self.kinds[row * self.cols + col]
+
+    def eat(self, index):
+        # returns the eaten kind, 0 if there was nothing on the tile
+        kind = self.kinds[index]
+        if kind:
+            if self.shared:
+                self.kinds = bytearray(self.kinds)
+                self.shared = False
+            self.kinds[index] = 0
+            self.remaining -= 1
+        return kind
+
+    def tiles(self):
+        for index, kind in enumerate(self.kinds):
+            if kind:
+                yield divmod(index, self.cols) + (kind,)
+
+    @property
+    def cleared(self):
+        return self.remaining == 0
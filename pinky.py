@@ -0,0 +1,16 @@
+from ghost_state import GhostState
+
+
+class Pinky(GhostState):
+    __slots__ = ()
+    name = 'pinky'
+    slot = 0
+
+    def scatter_target(self, state):
+        return -3, 2
+
+    def chase_target(self, state):
+        # four tiles in front of the player
+        row, col = state.player_tile()
+        dx, dy = state.player_direction()
+        return row + 4 * dy, col + 4 * dx
@@ -0,0 +1,138 @@
+import atexit
+import csv
+import json
+import os
+import time
+from array import array
+
+import pygame
+from settings import *
+
+# Frame timings of the game loops. A loop calls lap(phase) after each of its
+# phases and end_frame() once per frame; the last PROFILE_FRAMES frames are
+# kept in ring buffers for the percentiles, the overlay (toggled with F3)
+# and the CSV/JSON written to PROFILE_DIR when the game exits.
+
+TOGGLE_KEY = pygame.K_F3
+HISTOGRAM_MS = 50  # 1 ms buckets, the last one takes everything slower
+REFRESH_FRAMES = 50  # overlay text is rebuilt this often
+
+_profilers = {}
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Profiler:
+
+    def __init__(self, name, phases):
+        self.name = name
+        self.phases = phases
+        self.index = {phase: i for i, phase in enumerate(phases)}
+        self.times = [array('q', bytes(8 * PROFILE_FRAMES)) for _ in phases]
+        self.totals = array('q', bytes(8 * PROFILE_FRAMES))
+        self.histogram = [0] * (HISTOGRAM_MS + 1)
+        self.current = [0] * len(phases)
+        self.frames = 0
+        self.last = time.perf_counter_ns()
+        self.visible = False
+        self.toggled = False
+        self.lines = []
+        self.startup_ms = None  # program start to this loop's first frame
+
+    def startup(self, seconds):
+        self.startup_ms = seconds * 1000
+
+    def restart(self):
+        # drops the time since the loop last ran
+        self.current = [0] * len(self.phases)
+        self.last = time.perf_counter_ns()
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key == TOGGLE_KEY:
+            self.visible = not self.visible
+            self.toggled = True
+            self.lines = self.summary_lines()
+
+    def lap(self, phase):
+        now = time.perf_counter_ns()
+        self.current[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        slot = self.frames % PROFILE_FRAMES
+        if self.frames >= PROFILE_FRAMES:
+            self.histogram[min(self.totals[slot] // 1000000, HISTOGRAM_MS)] -= 1
+        total = 0
+        for i, elapsed in enumerate(self.current):
+            self.times[i][slot] = elapsed
+            self.current[i] = 0
+            total += elapsed
+        self.totals[slot] = total
+        self.histogram[min(total // 1000000, HISTOGRAM_MS)] += 1
+        self.frames += 1
+        if self.visible and self.frames % REFRESH_FRAMES == 0:
+            self.lines = self.summary_lines()
+
+    def kept(self):
+        return min(self.frames, PROFILE_FRAMES)
+
+    def summary(self):
+        kept = self.kept()
+        ordered = sorted(self.totals[:kept])
+        return {
+            "loop": self.name,
+            "frames": self.frames,
+            "frame_ms": {name: percentile(ordered, fraction) / 1e6
+                         for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "phase_ms": {phase: sum(times[:kept]) / max(kept, 1) / 1e6
+                         for phase, times in zip(self.phases, self.times)},
+            "histogram_ms": self.histogram,
+            "startup_ms": self.startup_ms,
+        }
+
+    def summary_lines(self):
+        summary = self.summary()
+        lines = ["%s, %d frames" % (self.name, summary["frames"]),
+                 "p50 %.1f  p95 %.1f  p99 %.1f ms" % tuple(summary["frame_ms"].values())]
+        lines += ["%-7s %6.2f ms" % item for item in summary["phase_ms"].items()]
+        if self.startup_ms is not None:
+            lines.append("startup %6.0f ms" % self.startup_ms)
+        return lines
+
+    def export(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "%s-%s" % (self.name, time.strftime("%Y%m%d-%H%M%S")))
+        kept = self.kept()
+        # oldest frame first once the ring buffer has wrapped
+        start = self.frames % PROFILE_FRAMES if self.frames > PROFILE_FRAMES else 0
+        with open(path + ".csv", "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame"] + ["%s_ns" % phase for phase in self.phases] + ["total_ns"])
+            for i in range(kept):
+                slot = (start + i) % PROFILE_FRAMES
+                writer.writerow([self.frames - kept + i] + [times[slot] for times in self.times] + [self.totals[slot]])
+        with open(path + ".json", "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+def get_profiler(name, phases=("events", "update", "draw", "flip", "tick")):
+    # one per loop, kept for the whole run so coming back keeps the history
+    if name not in _profilers:
+        _profilers[name] = Profiler(name, phases)
+    profiler = _profilers[name]
+    profiler.restart()
+    return profiler
+
+
+def export_all():
+    if PROFILE_DIR:
+        for profiler in _profilers.values():
+            if profiler.frames:
+                profiler.export(PROFILE_DIR)
+
+
+atexit.register(export_all)
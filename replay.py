@@ -0,0 +1,165 @@
+import argparse
+import os
+import queue
+import struct
+import threading
+import time
+
+from settings import *
+from game_state import GameState
+
+# A game is fully decided by its level, seed and the direction changes the
+# player made, so that is all a replay keeps: a header, then a record for
+# every tick the direction changed and a checksum of the state every
+# REPLAY_CHECKSUM_TICKS ticks to catch a replay that drifts.
+
+MAGIC = b"PMRP"
+VERSION = 2
+KEYS = 'asdw'
+CHECKSUM = 4
+END = 5
+
+# magic, version, rows, cols, player x, player y, seed, ghosts, checksum ticks
+HEADER = struct.Struct("<4sHHHHHIBH")  # then the level map
+INPUT = struct.Struct("<BI")  # key, tick
+CHECK = struct.Struct("<BII")  # CHECKSUM or END, tick, checksum
+
+
+class Recorder:
+    # wraps the input source of a game, the file is written by a thread
+
+    def __init__(self, path, state, controls):
+        self.state = state
+        self.controls = controls
+        self.records = queue.Queue()
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, state.rows, state.cols, *state.player_spawn,
+                                    state.seed, bool(state.ghosts), REPLAY_CHECKSUM_TICKS))
+        self.file.write(state.maze.glyphs)
+        self.writer = threading.Thread(target=self.write, daemon=True)
+        self.writer.start()
+
+    def __call__(self):
+        state = self.state
+        action = self.controls()
+        if state.tick % REPLAY_CHECKSUM_TICKS == 0:
+            self.records.put(CHECK.pack(CHECKSUM, state.tick, state.checksum()))
+        if action is not None and action != state.player.key_pressed:
+            self.records.put(INPUT.pack(KEYS.index(action), state.tick))
+        return action
+
+    def write(self):
+        while True:
+            records = [self.records.get()]
+            while not self.records.empty():
+                records.append(self.records.get())
+            if None in records:
+                self.file.write(b''.join(records[:records.index(None)]))
+                self.file.close()
+                return
+            self.file.write(b''.join(records))
+            self.file.flush()
+
+    def close(self):
+        self.records.put(CHECK.pack(END, self.state.tick, self.state.checksum()))
+        self.records.put(None)
+        self.writer.join()
+
+
+class Replayer:
+    # input source playing a recorded game back into a fresh state
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, rows, cols, player_x, player_y, seed, ghosts, self.checksum_ticks = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a replay" % path)
+        offset = HEADER.size
+        glyphs = data[offset:offset + rows * cols].decode('ascii')
+        self.level_map = [glyphs[row * cols:(row + 1) * cols] for row in range(rows)]
+        self.player_spawn = (player_x, player_y)
+        self.state = GameState(self.level_map, self.player_spawn, ghosts=bool(ghosts), seed=seed)
+
+        offset += rows * cols
+        self.inputs = {}
+        self.checksums = {}
+        self.end = None
+        while offset < len(data):
+            kind = data[offset]
+            if kind < len(KEYS):
+                _, tick = INPUT.unpack_from(data, offset)
+                self.inputs[tick] = KEYS[kind]
+                offset += INPUT.size
+            else:
+                _, tick, checksum = CHECK.unpack_from(data, offset)
+                self.checksums[tick] = checksum
+                if kind == END:
+                    self.end = tick
+                offset += CHECK.size
+        # a game that was killed has no END record, it goes as far as the log
+        if self.end is None:
+            self.end = max(list(self.inputs) + list(self.checksums), default=0)
+
+    @property
+    def finished(self):
+        return self.state.tick >= self.end
+
+    def __call__(self):
+        state = self.state
+        checksum = self.checksums.get(state.tick)
+        if checksum is not None and checksum != state.checksum():
+            raise ValueError("replay diverged at tick %d" % state.tick)
+        return self.inputs.get(state.tick)
+
+
+def new_recording():
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    return os.path.join(REPLAY_DIR, time.strftime("%Y%m%d-%H%M%S") + "-%d.pmr" % os.getpid())
+
+
+def run_headless(path):
+    # as fast as python allows, returns the replayed state
+    replayer = Replayer(path)
+    state = replayer.state
+    while not replayer.finished:
+        state.step(replayer())
+    replayer()
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play back a recorded game")
+    parser.add_argument("path")
+    parser.add_argument("--headless", action="store_true", help="no window, as fast as possible")
+    parser.add_argument("--speed", type=float, default=1, help="speed multiplier when shown")
+    parser.add_argument("--render", metavar="DIR",
+                        help="no window, every tick drawn and written to DIR as fast as possible")
+    args = parser.parse_args()
+
+    if args.headless:
+        started = time.perf_counter()
+        state = run_headless(args.path)
+        elapsed = time.perf_counter() - started
+        print("%d ticks in %.3f s (%d ticks/s), score %d, checksums ok" %
+              (state.tick, elapsed, state.tick / elapsed, state.score))
+    else:
+        if args.render:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        from scenes import SceneManager
+        from level_1 import LevelScene
+        replayer = Replayer(args.path)
+        manager = SceneManager()
+        scene = LevelScene(manager, replayer.level_map, "Replay", replayer.player_spawn, replayer, args.speed,
+                           args.render)
+        manager.push(scene)
+        started = time.perf_counter()
+        manager.run()
+        if args.render:
+            elapsed = time.perf_counter() - started
+            print("%d frames in %.1f s for %.1f s of game, written to %s" %
+                  (scene.capture.frames, elapsed, replayer.state.tick / TICK_RATE, args.render))
+
+
+if __name__ == "__main__":
+    main()
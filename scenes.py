@@ -0,0 +1,235 @@
+import time
+
+import pygame
+from settings import *
+from drawing import Drawing
+from profiler import get_profiler
+from button import ButtonLayout
+from view import view
+
+# One window and one loop for the whole game. Menus and levels are scenes on
+# a stack, the top one gets the events and the frames; going to another
+# screen pushes it and coming back pops, so nothing recurses or reopens the
+# display. Menus are created once and reused.
+
+
+class Scene:
+    name = "scene"  # the profiler it reports to
+    caption = "Pac-Man"
+    fps = FPS
+    animating = True  # False lets the loop sleep until the next event
+    pacer = None  # a FramePacer picks the frame rate instead of fps
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def enter(self):
+        # the scene is on top again, after a push or when the one above left
+        pass
+
+    def leave(self):
+        # the scene was popped
+        pass
+
+    def crashed(self):
+        pass
+
+    def handle(self, event):
+        pass
+
+    def resized(self):
+        # the window has another size, everything is drawn again
+        pass
+
+    def update(self):
+        pass
+
+    def draw(self):
+        # returns the rects to update, None to flip the whole display
+        return None
+
+
+class FramePacer:
+    # frame rate that follows what the machine manages: it backs off when
+    # frames use most of their budget and creeps back up when they don't
+
+    def __init__(self, max_fps, min_fps=MIN_FPS):
+        self.max_fps = max_fps
+        self.min_fps = min(min_fps, max_fps)
+        self.fps = max_fps
+        self.cost = 0.0
+
+    def record(self, seconds):
+        # time the last frame took, without the sleep
+        self.cost += (seconds - self.cost) * 0.1
+        budget = 1 / self.fps
+        if self.cost > budget * 0.8:
+            self.fps = max(self.min_fps, self.fps * 0.95)
+        elif self.cost < budget * 0.4:
+            self.fps = min(self.max_fps, self.fps * 1.02)
+
+
+class MenuScene(Scene):
+    # a menu only changes when the mouse does something, so it is drawn
+    # once and after that only the buttons that lit up or went dark
+    animating = False
+
+    def __init__(self, manager, buttons):
+        super().__init__(manager)
+        self.layout = ButtonLayout(buttons)
+        self.dirty = []
+        self.clicked = None
+        self.repaint = True
+
+    def enter(self):
+        self.layout.hover(view.logical(pygame.mouse.get_pos()))
+        self.clicked = None
+        self.repaint = True
+
+    def handle(self, event):
+        # buttons are laid out like everything else, the mouse is mapped back
+        if event.type == pygame.MOUSEMOTION:
+            self.dirty += self.layout.hover(view.logical(event.pos))
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.clicked = self.layout.click(view.logical(event.pos)) or self.clicked
+        elif event.type == pygame.WINDOWEXPOSED:
+            self.repaint = True
+
+    def resized(self):
+        self.repaint = True
+
+    def update(self):
+        if self.clicked is not None:
+            clicked, self.clicked = self.clicked, None
+            self.press(clicked)
+
+    def press(self, name):
+        pass
+
+    def draw_background(self):
+        self.manager.screen.fill(BLACK)
+
+    def draw(self):
+        drawer = self.manager.drawer
+        if self.repaint:
+            self.repaint = False
+            self.dirty = []
+            self.draw_background()
+            for button in self.layout.buttons.values():
+                drawer.drawing_button(button)
+            return [self.manager.screen.get_rect()]
+        rects = [drawer.drawing_button(button) for button in self.dirty]
+        self.dirty = []
+        return rects
+
+
+class SceneManager:
+
+    def __init__(self, launched=None):
+        # launched, the perf_counter() when the program started, gives the
+        # startup time to the first scene's profiler
+        self.launched = launched
+        pygame.display.init()
+        if FULLSCREEN:
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.screen = pygame.display.set_mode((int(WIDTH * WINDOW_SCALE), int(HEIGHT * WINDOW_SCALE)),
+                                                  pygame.RESIZABLE)
+        view.resize(self.screen.get_size())
+        self.drawer = Drawing(self.screen)
+        self.clock = pygame.time.Clock()
+        self.stack = []
+        self.scenes = {}
+        self.frames = 0
+        self.active = None
+        self.profiler = None
+
+    def scene(self, scene_class):
+        # menus are built the first time they are shown, then kept
+        if scene_class not in self.scenes:
+            self.scenes[scene_class] = scene_class(self)
+        return self.scenes[scene_class]
+
+    def push(self, scene):
+        self.stack.append(scene)
+
+    def pop(self):
+        self.stack.pop().leave()
+
+    def quit(self):
+        while self.stack:
+            self.pop()
+
+    def activate(self, scene):
+        self.active = scene
+        self.profiler = get_profiler(scene.name)
+        pygame.display.set_caption(scene.caption)
+        scene.enter()
+
+    def resize(self):
+        # pygame has already resized the display surface
+        self.screen = pygame.display.get_surface()
+        self.drawer.screen = self.screen
+        view.resize(self.screen.get_size())
+
+    def run(self):
+        try:
+            while self.stack:
+                self.frame()
+        except Exception:
+            if self.stack:
+                self.stack[-1].crashed()
+            raise
+        finally:
+            self.quit()
+
+    def frame(self):
+        scene = self.stack[-1]
+        if scene is not self.active:
+            self.activate(scene)
+        profiler = self.profiler
+        started = time.perf_counter()
+
+        events = pygame.event.get()
+        if not events and not scene.animating:
+            # nothing moves on screen, sleep until something happens
+            events = [pygame.event.wait()]
+            profiler.lap("tick")
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.quit()
+                return
+            if event.type == pygame.VIDEORESIZE:
+                self.resize()
+                scene.resized()
+            profiler.handle(event)
+            scene.handle(event)
+        profiler.lap("events")
+
+        scene.update()
+        profiler.lap("update")
+        if not self.stack or self.stack[-1] is not scene:
+            # the scene left, the next frame belongs to the new top
+            return
+
+        rects = scene.draw()
+        profile_rect = self.drawer.drawing_profile(profiler)
+        if rects is not None and profile_rect:
+            rects.append(profile_rect)
+        profiler.lap("draw")
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        profiler.lap("flip")
+        self.frames += 1
+        if self.launched is not None:
+            profiler.startup(time.perf_counter() - self.launched)
+            self.launched = None
+        if scene.pacer is not None:
+            scene.pacer.record(time.perf_counter() - started)
+            self.clock.tick(scene.pacer.fps)
+        elif scene.animating:
+            self.clock.tick(scene.fps)
+        profiler.lap("tick")
+        profiler.end_frame()
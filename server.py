@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import struct
+import time
+
+from settings import *
+from game_state import GameState, KEY_INDEX
+from tournament import get_agent, get_level
+
+# Local game server for lobby screens: one authoritative game ticking on its
+# own clock, broadcast to any number of spectators over TCP or a Unix socket
+#
+#   python server.py --level "Level 3" --agent agents:pellet_chaser
+#   python spectator.py
+#
+# A spectator first gets the level and a snapshot of the game, after that
+# only what changed every SPECTATOR_TICKS ticks: the pellets eaten and the
+# actors that moved. Every spectator gets the same bytes, so a broadcast is
+# encoded once however many are watching. The first client to send a key
+# plays instead of the agent until it leaves.
+
+GAME = 0
+DELTA = 1
+
+MESSAGE = struct.Struct("<BI")  # kind, length of what follows
+GAME_HEADER = struct.Struct("<HHHHB")  # rows, cols, player x, player y, ghosts; then the level map and a snapshot
+DELTA_HEADER = struct.Struct("<IB")  # tick, what changed
+DELTA_SCORE = struct.Struct("<IBB")  # score, lives, game over
+DELTA_PLAYER = struct.Struct("<hhH")  # x, y, angle
+DELTA_GHOST = struct.Struct("<hhBB")  # x, y, key, frightened | in house << 1
+DELTA_PELLETS = struct.Struct("<H")  # count, then the tiles eaten
+
+CHANGED_SCORE = 1
+CHANGED_PLAYER = 2
+CHANGED_GHOST = 4  # shifted left by the ghost's index
+
+RESTART_SECONDS = 3  # a finished game stays on the screens this long
+
+
+def message(kind, payload):
+    return MESSAGE.pack(kind, len(payload)) + payload
+
+
+def game_message(state):
+    return message(GAME, GAME_HEADER.pack(state.rows, state.cols, *state.player_spawn, bool(state.ghosts)) +
+                   state.maze.glyphs + state.snapshot())
+
+
+def delta_values(state):
+    # what a delta compares, in the order it is sent
+    player = state.player
+    return ((state.score, state.lives, state.game_over), (player.x, player.y, player.angle),
+            [(ghost.x, ghost.y, KEY_INDEX[ghost.key], ghost.frightened | ghost.in_house << 1)
+             for ghost in state.ghosts])
+
+
+class Server:
+
+    def __init__(self, level_map, player_spawn, agent, seed=0):
+        self.level_map = level_map
+        self.player_spawn = player_spawn
+        self.agent_spec = agent
+        self.clients = set()
+        self.joining = []  # get the game at the next broadcast
+        self.player = None  # the client playing, None while the agent does
+        self.key = None
+        self.new_game(seed)
+
+    def new_game(self, seed):
+        self.seed = seed
+        self.state = GameState(self.level_map, self.player_spawn, seed=seed)
+        self.agent = get_agent(self.agent_spec, seed)
+        self.sent = delta_values(self.state)
+        self.eaten = []
+        self.joining += self.clients
+        self.clients = set()
+
+    def step(self):
+        if self.player is not None:
+            action, self.key = self.key, None
+        else:
+            action = self.agent(self.state)
+        cols = self.state.cols
+        for row, col in self.state.step(action):
+            self.eaten.append(row * cols + col)
+
+    def delta(self):
+        # everything that changed since the last broadcast
+        score, player, ghosts = values = delta_values(self.state)
+        sent_score, sent_player, sent_ghosts = self.sent
+        self.sent = values
+        changed = 0
+        data = []
+        if score != sent_score:
+            changed |= CHANGED_SCORE
+            data.append(DELTA_SCORE.pack(*score))
+        if player != sent_player:
+            changed |= CHANGED_PLAYER
+            data.append(DELTA_PLAYER.pack(*player))
+        for i, (ghost, sent) in enumerate(zip(ghosts, sent_ghosts)):
+            if ghost != sent:
+                changed |= CHANGED_GHOST << i
+                data.append(DELTA_GHOST.pack(*ghost))
+        data.append(DELTA_PELLETS.pack(len(self.eaten)))
+        data.append(struct.pack("<%dH" % len(self.eaten), *self.eaten))
+        self.eaten = []
+        return message(DELTA, DELTA_HEADER.pack(self.state.tick, changed) + b''.join(data))
+
+    def broadcast(self):
+        self.send(self.clients, self.delta())
+        if self.joining:
+            # the snapshot is what the others just got
+            joining, self.joining = self.joining, []
+            self.clients.update(self.send(joining, game_message(self.state)))
+
+    def send(self, clients, data):
+        # returns the clients that got it, the others are dropped
+        sent = []
+        for writer in list(clients):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > SPECTATOR_BUFFER:
+                # can't keep up, waiting for it would hold the game back
+                self.drop(writer)
+            else:
+                writer.write(data)
+                sent.append(writer)
+        return sent
+
+    def drop(self, writer):
+        self.clients.discard(writer)
+        if writer in self.joining:
+            self.joining.remove(writer)
+        if self.player is writer:
+            self.player = None
+        writer.close()
+
+    async def client(self, reader, writer):
+        self.joining.append(writer)
+        try:
+            while True:
+                data = await reader.read(64)
+                if not data:
+                    break
+                if self.player is None:
+                    self.player = writer
+                key = chr(data[-1])
+                if self.player is writer and key in KEY_INDEX:
+                    self.key = key
+        except ConnectionError:
+            pass
+        finally:
+            self.drop(writer)
+
+    async def run(self):
+        tick_ns = int(1e9 / TICK_RATE)
+        next_tick = time.perf_counter_ns()
+        while True:
+            self.step()
+            finished = self.state.game_over or self.state.cleared
+            if self.state.tick % SPECTATOR_TICKS == 0 or finished:
+                self.broadcast()
+            if finished:
+                print("game %d over: score %d, %d watching" % (self.seed, self.state.score, len(self.clients)))
+                await asyncio.sleep(RESTART_SECONDS)
+                self.new_game(self.seed + 1)
+                self.broadcast()
+                next_tick = time.perf_counter_ns()
+
+            next_tick += tick_ns
+            delay = next_tick - time.perf_counter_ns()
+            if delay < -tick_ns * MAX_TICKS_PER_FRAME:
+                # too far behind to catch up, slow down instead
+                next_tick -= delay
+            # always yields, so the clients are served between ticks
+            await asyncio.sleep(max(delay, 0) / 1e9)
+
+
+async def serve(server, host, port, unix=None):
+    if unix:
+        listener = await asyncio.start_unix_server(server.client, unix)
+    else:
+        listener = await asyncio.start_server(server.client, host, port)
+    async with listener:
+        await server.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a game for spectators to watch")
+    parser.add_argument("--level", default="Level 1", help="level name or level file")
+    parser.add_argument("--agent", default="agents:pellet_chaser", help="plays while no client does")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SPECTATOR_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead")
+    args = parser.parse_args()
+
+    level_map, player_spawn = get_level(args.level)
+    server = Server(level_map, player_spawn, args.agent, args.seed)
+    print("serving %s on %s" % (args.level, args.unix or "%s:%d" % (args.host, args.port)))
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,5 @@
-import pygame
-
-
-pygame.init()
 # ALL THE GAME SETTINGS
 
-all_sprites_1 = pygame.sprite.Group()
-points_sprites = pygame.sprite.Group()
-
 level_1_map = [
     "b333333333333cb333333333333c",
     "2............42............4",
@@ -42,33 +35,52 @@ level_1_map = [
 ]
 
 
-# Walls textures
+# Walls textures, names from the assets manifest
 WALLS_NUMBERS = {
-    '1': pygame.image.load("images/wall_up.png"),
-    '2': pygame.image.load("images/wall_right.png"),
-    '3': pygame.image.load("images/wall_down.png"),
-    '4': pygame.image.load("images/wall_left.png"),
-    '5': pygame.image.load("images/wall_turn_up-right.png"),
-    '6': pygame.image.load("images/wall_turn_right-down.png"),
-    '7': pygame.image.load("images/wall_turn_down-left.png"),
-    '8': pygame.image.load("images/wall_turn_left-up.png"),
-    'a': pygame.image.load("images/wall_corner_up-right.png"),
-    'b': pygame.image.load("images/wall_corner_right-down.png"),
-    'c': pygame.image.load("images/wall_corner_down-left.png"),
-    'd': pygame.image.load("images/wall_corner_left-up.png")
+    '1': 'wall_up',
+    '2': 'wall_right',
+    '3': 'wall_down',
+    '4': 'wall_left',
+    '5': 'wall_turn_up-right',
+    '6': 'wall_turn_right-down',
+    '7': 'wall_turn_down-left',
+    '8': 'wall_turn_left-up',
+    'a': 'wall_corner_up-right',
+    'b': 'wall_corner_right-down',
+    'c': 'wall_corner_down-left',
+    'd': 'wall_corner_left-up'
 }
 
 POINTS_NUMBERS = {
-    '.': pygame.image.load("images/small_point.png"),
-    'O': pygame.image.load("images/big_point.png"),
+    '.': 'small_point',
+    'O': 'big_point',
 }
 
 # Player settings
 PLAYER_ANIMATION = {
-    0: pygame.transform.scale(pygame.image.load("images/pacman_opened.png"), (20, 20)),
-    1: pygame.transform.scale(pygame.image.load("images/pacman_closed.png"), (20, 20))
+    0: 'pacman_opened',
+    1: 'pacman_closed'
 }
 player_speed = 3
+PLAYER_SPAWN = (270, 340)
+PLAYER_LIVES = 3
+
+# Ghosts settings, speeds are in sixteenths of a pixel per tick (the player does 16)
+GHOST_SPEED = 15
+FRIGHTENED_SPEED = 8
+FRIGHTENED_TICKS = 600
+GHOST_RESPAWN_TICKS = 300
+GHOST_POINTS = 200  # doubles for every next ghost eaten on the same power pellet
+GHOST_RELEASE = {'blinky': 0, 'pinky': 0, 'inky': 600, 'clyde': 1200}
+# (ticks, mode) in order, chase for good once they run out
+GHOST_MODES = ((700, 'scatter'), (2000, 'chase'), (700, 'scatter'), (2000, 'chase'),
+               (500, 'scatter'), (2000, 'chase'), (500, 'scatter'))
+
+# Ghosts textures
+GHOST_ANIMATION = {
+    name: {side: '%s_%s' % (name, side) for side in ('up', 'down', 'front1', 'front2')}
+    for name in ('blinky', 'pinky', 'inky', 'clyde')
+}
 
 # Main window settings
 WIDTH_MAP = 700
@@ -76,9 +88,31 @@ HEIGHT_MAP = 775
 WIDTH = 800
 HEIGHT = 775
 TILE = 20
+WINDOW_SCALE = 1  # window size as a multiple of WIDTH x HEIGHT, it can be resized too
+FULLSCREEN = False  # whole screen at its own resolution, for the cabinets
 HALF_HEIGHT_MAP = HEIGHT_MAP // 2
 HALF_WIDTH_MAP = WIDTH_MAP // 2
 FPS = 100
+FIXED_TIMESTEP = True  # game runs at TICK_RATE whatever the frame rate, frames in between are interpolated
+TICK_RATE = 100
+MIN_FPS = 30  # frame rate the pacing may fall back to on a slow machine
+MAX_TICKS_PER_FRAME = 10  # beyond this the game slows down rather than skipping frames
+DIRTY_RENDERING = True  # redraw only what changed instead of the whole level
+TEXT_CACHE_SIZE = 512  # rendered strings kept around, the title alone cycles 255 colors
+MAZE_CACHE_SIZE = 8  # compiled mazes and their ghost path tables kept around, generated levels come and go
+ASSETS_CACHE_DIR = ".cache"  # packed texture atlas is kept here, empty to always repack
+REPLAY_DIR = "replays"  # every game's input is recorded here, empty to not record
+REPLAY_CHECKSUM_TICKS = 100  # game state checksum written to replays this often
+PROFILE_FRAMES = 1000  # frame timings kept for the F3 overlay and the export
+PROFILE_DIR = ""  # frame timings are written here on exit, empty to not write them
+TRACE_EVENTS = 0  # gameplay events kept in memory, F9 or a crash dumps them, 0 to not trace
+TRACE_DIR = "traces"
+CAPTURE_DIR = ""  # level frames are captured here, empty to not capture
+CAPTURE_FORMAT = "png"  # "png" for one image per frame, "stream" for one compressed file
+CAPTURE_QUEUE = 8  # frames waiting for the writer before new ones are dropped
+SPECTATOR_PORT = 7654
+SPECTATOR_TICKS = 2  # ticks between the game server's broadcasts
+SPECTATOR_BUFFER = 256 * 1024  # bytes a spectator may fall behind before the server drops it
 
 # Colors
 BLINKY = (168, 22, 0)
@@ -0,0 +1,176 @@
+import argparse
+import socket
+import struct
+
+import pygame
+from settings import *
+from game_state import GameState
+from player import Player, get_action
+from ghost import Ghost
+from level_1_sprites import PelletLayer, build_walls, resize_actors
+from scenes import Scene, SceneManager
+from server import (GAME, MESSAGE, GAME_HEADER, DELTA_HEADER, DELTA_SCORE, DELTA_PLAYER, DELTA_GHOST, DELTA_PELLETS,
+                    CHANGED_SCORE, CHANGED_PLAYER, CHANGED_GHOST)
+
+# Watches a game run by server.py, drawn like a level played here. With
+# --play the keyboard goes to the server, whoever sends a key first plays.
+
+
+class SpectatorScene(Scene):
+    name = "spectator"
+    caption = "Pac-Man spectator"
+
+    def __init__(self, manager, connection, play=False):
+        super().__init__(manager)
+        self.connection = connection
+        self.connection.setblocking(False)
+        self.play = play
+        self.sent_key = None
+        self.received = bytearray()
+        self.state = None  # until the server sends the game
+        self.repaint = True
+
+    def enter(self):
+        self.repaint = True
+
+    def leave(self):
+        self.connection.close()
+
+    def resized(self):
+        if self.state is not None:
+            self.walls = build_walls(self.level_map)
+            self.pellet_layer = self.player.pellet_layer = PelletLayer(self.state.pellets)
+            resize_actors(self.actors)
+        self.repaint = True
+
+    def receive(self):
+        # False once the server is gone
+        while True:
+            try:
+                data = self.connection.recv(1 << 16)
+            except BlockingIOError:
+                return True
+            except ConnectionError:
+                return False
+            if not data:
+                return False
+            self.received += data
+
+    def update(self):
+        if self.state is not None:
+            self.player.eaten = []
+        if not self.receive():
+            self.manager.pop()
+            return
+        received = self.received
+        offset = 0
+        while len(received) - offset >= MESSAGE.size:
+            kind, length = MESSAGE.unpack_from(received, offset)
+            end = offset + MESSAGE.size + length
+            if len(received) < end:
+                break
+            payload = bytes(received[offset + MESSAGE.size:end])
+            if kind == GAME:
+                self.start(payload)
+            elif self.state is not None:
+                self.apply(payload)
+            offset = end
+        del received[:offset]
+
+        if self.play:
+            key = get_action()
+            if key is not None and key != self.sent_key:
+                self.connection.send(key.encode())
+                self.sent_key = key
+
+    def start(self, payload):
+        rows, cols, player_x, player_y, ghosts = GAME_HEADER.unpack_from(payload)
+        offset = GAME_HEADER.size
+        glyphs = payload[offset:offset + rows * cols].decode('ascii')
+        self.level_map = [glyphs[row * cols:(row + 1) * cols] for row in range(rows)]
+        self.state = GameState(self.level_map, (player_x, player_y), ghosts=bool(ghosts))
+        self.state.restore(payload[offset + rows * cols:])
+
+        self.walls = build_walls(self.level_map)
+        self.pellet_layer = PelletLayer(self.state.pellets)
+        self.actors = pygame.sprite.LayeredDirty()
+        self.player = Player(self.actors, self.state, self.pellet_layer, None)
+        self.ghosts = [Ghost(self.actors, ghost) for ghost in self.state.ghosts]
+        self.repaint = True
+
+    def apply(self, payload):
+        state = self.state
+        tick, changed = DELTA_HEADER.unpack_from(payload)
+        for _ in range(tick - state.tick):
+            self.player.tick()
+            for ghost in self.ghosts:
+                ghost.tick()
+        state.tick = tick
+
+        offset = DELTA_HEADER.size
+        if changed & CHANGED_SCORE:
+            state.score, state.lives, game_over = DELTA_SCORE.unpack_from(payload, offset)
+            state.game_over = bool(game_over)
+            offset += DELTA_SCORE.size
+        if changed & CHANGED_PLAYER:
+            player = state.player
+            player.x, player.y, player.angle = DELTA_PLAYER.unpack_from(payload, offset)
+            offset += DELTA_PLAYER.size
+        for i, ghost in enumerate(state.ghosts):
+            if changed & CHANGED_GHOST << i:
+                ghost.x, ghost.y, key, flags = DELTA_GHOST.unpack_from(payload, offset)
+                ghost.key, ghost.frightened, ghost.in_house = 'asdw'[key], bool(flags & 1), bool(flags & 2)
+                offset += DELTA_GHOST.size
+
+        count, = DELTA_PELLETS.unpack_from(payload, offset)
+        offset += DELTA_PELLETS.size
+        for index in struct.unpack_from("<%dH" % count, payload, offset):
+            if state.pellets.eat(index):
+                row, col = divmod(index, state.cols)
+                self.pellet_layer.erase(row, col)
+                self.player.eaten.append((row, col))
+
+        self.player.show()
+        for ghost in self.ghosts:
+            ghost.show()
+
+    def draw(self):
+        screen = self.manager.screen
+        drawer = self.manager.drawer
+        if self.state is None:
+            screen.fill(BLACK)
+            return None
+        if DIRTY_RENDERING:
+            if self.repaint:
+                self.repaint = False
+                drawer.drawing_level_background(self.walls, self.pellet_layer, self.actors)
+            return drawer.drawing_level_dirty(self.player, self.manager.clock)
+        screen.fill(BLACK)
+        drawer.drawing_level(self.walls, self.player, self.pellet_layer, self.actors)
+        drawer.drawing_fps(self.manager.clock)
+        return None
+
+
+def connect(host, port, unix=None):
+    if unix:
+        connection = socket.socket(socket.AF_UNIX)
+        connection.connect(unix)
+        return connection
+    return socket.create_connection((host, port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a game run by server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SPECTATOR_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead")
+    parser.add_argument("--play", action="store_true", help="send the keyboard to the server")
+    args = parser.parse_args()
+
+    manager = SceneManager()
+    manager.push(SpectatorScene(manager, connect(args.host, args.port, args.unix), args.play))
+    manager.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import time
+launched = time.perf_counter()  # before the imports, they are part of the startup
+
 from main_menu import main_menu
-from level_menu import level_menu_main
 
-def
\ No newline at end of file
+main_menu(launched)
@@ -0,0 +1,153 @@
+import argparse
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from settings import *
+from game_state import GameState
+from level_files import LEVEL_FILES, load_level
+
+# Ranks bots over many headless games spread over a process pool. Every
+# finished game is appended to a JSON lines checkpoint as soon as it comes
+# back, so a run that was stopped picks up where it left off:
+#
+#   python tournament.py --agents agents:random_walk agents:pellet_chaser --seeds 100
+
+
+def get_level(name):
+    # "Level 1" to "Level 5" or the path of a level file
+    if name == "Level 1":
+        return level_1_map, PLAYER_SPAWN
+    level = load_level(LEVEL_FILES.get(name, name))
+    return level.level_map, level.player_spawn
+
+
+def get_agent(spec, seed):
+    # "module:factory", the factory takes the game's seed
+    module, _, factory = spec.partition(":")
+    return getattr(importlib.import_module(module), factory)(seed)
+
+
+def play(agent_spec, level_name, seed, max_ticks):
+    level_map, player_spawn = get_level(level_name)
+    state = GameState(level_map, player_spawn, seed=seed)
+    agent = get_agent(agent_spec, seed)
+    pellets = state.pellets.remaining
+    while not state.game_over and not state.cleared and state.tick < max_ticks:
+        state.step(agent(state))
+    eaten = pellets - state.pellets.remaining
+    return {
+        "agent": agent_spec,
+        "level": level_name,
+        "seed": seed,
+        "max_ticks": max_ticks,
+        "score": state.score,
+        "ticks": state.tick,
+        "pellets": eaten,
+        "pellets_per_second": eaten * TICK_RATE / max(state.tick, 1),
+        "cleared": state.cleared,
+        "lives": state.lives,
+    }
+
+
+def game_key(result):
+    # a game played under another tick limit is another game
+    return result["agent"], result["level"], result["seed"], result.get("max_ticks")
+
+
+def read_checkpoint(path):
+    results = []
+    if path and os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                # a line cut short by the interruption is played again
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    pass
+    return results
+
+
+def run(agents, levels, seeds, max_ticks, workers=None, checkpoint=None):
+    # yields every game's result as it finishes, checkpointed ones first;
+    # the checkpoint may hold games of other runs, only this run's are used
+    grid = [(agent, level, seed, max_ticks) for agent in agents for level in levels for seed in seeds]
+    wanted = set(grid)
+    done = {}
+    for result in read_checkpoint(checkpoint):
+        key = game_key(result)
+        if key in wanted:
+            done[key] = result
+    yield from done.values()
+    games = [key for key in grid if key not in done]
+    if not games:
+        return
+
+    output = open(checkpoint, "a") if checkpoint else None
+    if output and output.tell():
+        # start on a line of its own after a line that was cut short
+        with open(checkpoint, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read() != b"\n":
+                output.write("\n")
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(play, *game) for game in games]
+            for future in as_completed(futures):
+                result = future.result()
+                if output:
+                    output.write(json.dumps(result) + "\n")
+                    output.flush()
+                yield result
+    finally:
+        if output:
+            output.close()
+
+
+def aggregate(results):
+    # {(agent, level): totals} with the means worked out
+    table = {}
+    for result in results:
+        row = table.setdefault((result["agent"], result["level"]), {
+            "games": 0, "score": 0, "ticks": 0, "pellets_per_second": 0, "cleared": 0})
+        row["games"] += 1
+        row["score"] += result["score"]
+        row["ticks"] += result["ticks"]
+        row["pellets_per_second"] += result["pellets_per_second"]
+        row["cleared"] += result["cleared"]
+    for row in table.values():
+        for column in ("score", "ticks", "pellets_per_second", "cleared"):
+            row[column] /= row["games"]
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play bots against each other over many headless games")
+    parser.add_argument("--agents", nargs="+", default=["agents:random_walk", "agents:pellet_chaser"])
+    parser.add_argument("--levels", nargs="+", default=["Level 1"])
+    parser.add_argument("--seeds", type=int, default=20, help="games per agent and level")
+    parser.add_argument("--max-ticks", type=int, default=60 * TICK_RATE)
+    parser.add_argument("--workers", type=int, default=None, help="processes, all cores by default")
+    parser.add_argument("--checkpoint", default="tournament.jsonl", help="empty to not keep one")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = []
+    total = len(args.agents) * len(args.levels) * args.seeds
+    for result in run(args.agents, args.levels, range(args.seeds), args.max_ticks, args.workers, args.checkpoint):
+        results.append(result)
+        print("%d/%d %s on %s seed %d: score %d in %d ticks" % (
+            len(results), total, result["agent"], result["level"], result["seed"], result["score"], result["ticks"]))
+
+    ranking = sorted(aggregate(results).items(), key=lambda item: -item[1]["score"])
+    print("\n%-28s %-10s %6s %9s %9s %9s %7s" % ("agent", "level", "games", "score", "ticks", "pellets/s", "cleared"))
+    for (agent, level), row in ranking:
+        print("%-28s %-10s %6d %9.1f %9.1f %9.2f %6.0f%%" % (
+            agent, level, row["games"], row["score"], row["ticks"], row["pellets_per_second"], row["cleared"] * 100))
+    print("%.1f s" % (time.perf_counter() - started))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import pygame
+from settings import *
+
+# Everything is laid out in logical pixels, TILE to a maze tile, on a WIDTH x
+# HEIGHT screen. The view maps that layout onto whatever window there is: a
+# whole number of pixels to a tile, so the maze grid stays exact, and the
+# layout centered in the window. Images are scaled once per tile size by the
+# frame cache, never per frame.
+
+
+class View:
+
+    def __init__(self):
+        self.tile = TILE
+        self.offset = (0, 0)
+
+    def resize(self, size):
+        width, height = size
+        self.tile = max(1, min(width * TILE // WIDTH, height * TILE // HEIGHT))
+        self.offset = ((width - self.scale(WIDTH)) // 2, (height - self.scale(HEIGHT)) // 2)
+
+    def scale(self, length):
+        return length * self.tile // TILE
+
+    def point(self, pos):
+        # every sprite, every frame
+        tile = self.tile
+        return self.offset[0] + pos[0] * tile // TILE, self.offset[1] + pos[1] * tile // TILE
+
+    def rect(self, rect):
+        # edges are scaled, not sizes, so rects side by side stay side by side
+        x, y, width, height = rect
+        left, top = self.point((x, y))
+        right, bottom = self.point((x + width, y + height))
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def logical(self, pos):
+        # a window position, the mouse's, back in the layout
+        return (pos[0] - self.offset[0]) * TILE // self.tile, (pos[1] - self.offset[1]) * TILE // self.tile
+
+
+view = View()